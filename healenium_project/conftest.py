@@ -6,21 +6,31 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
-import sqlite3
 from datetime import datetime
 from pathlib import Path
 import logging
 import os
 
+from locator_telemetry import LocatorTelemetryWriter
+from healed_locator_cache import HealedLocatorCache
+from locator_probe import STRATEGY_SCORES, alternative_strategies, probe
+
 
 class HealeniumTestCase:
-    def __init__(self, driver, db_conn):
+    def __init__(self, driver, telemetry, healed_cache=None):
         self.driver = driver
-        self.db_conn = db_conn
+        self.telemetry = telemetry  # LocatorTelemetryWriter; writes happen off the test thread
+        self.healed_cache = healed_cache  # HealedLocatorCache shared across tests and runs
+        self.probe_in_browser = True  # Probe all alternative strategies in one execute_script call
         self.current_test_name = None
 
     def find_element(self, by, locator, element_name=None):
         """Find element with self-healing capability"""
+        if self.healed_cache is not None:
+            element = self._find_cached(by, locator, element_name)
+            if element:
+                return element
+
         try:
             element = self.driver.find_element(by, locator)
             self._record_locator_success(by, locator, element_name)
@@ -35,115 +45,105 @@ class HealeniumTestCase:
     def _record_locator_success(self, by, locator, element_name):
         """Record successful locator usage"""
         try:
-            cursor = self.db_conn.cursor()
-            cursor.execute('''
-                INSERT INTO locators (
-                    element_name,
-                    locator_type,
-                    locator_value,
-                    page_url
-                ) VALUES (?, ?, ?, ?)
-            ''', (
+            self.telemetry.record_locator(
                 element_name or self.current_test_name,
                 str(by),
                 str(locator),
                 self.driver.current_url
-            ))
-            self.db_conn.commit()
+            )
         except Exception as e:
             logging.error(f"Error recording locator success: {str(e)}")
 
+    def _find_cached(self, by, locator, element_name):
+        """Try the locator this element was healed to on an earlier run"""
+        try:
+            # current_url is a WebDriver round trip; only fetch it for locators healed before
+            if not self.healed_cache.healed(element_name or self.current_test_name, by, locator):
+                return None
+            original = (element_name or self.current_test_name, str(by), str(locator), self.driver.current_url)
+            key = self.healed_cache.key(original[3], *original[:3])
+            cached = self.healed_cache.get(key)
+            if cached is None:
+                return None
+
+            try:
+                element = self.driver.find_element(*cached)
+            except Exception:
+                logging.debug(f"Cached healed locator went stale: {cached[0]}={cached[1]}")
+                self.healed_cache.invalidate(key)
+                return None
+
+            self.healed_cache.hit(key)
+            self.telemetry.record_healing(*original, *cached, self.healed_cache.entries[key]['score'], "SUCCESS")
+            return element
+
+        except Exception as e:
+            logging.error(f"Error reading healed locator cache: {str(e)}")
+            return None
+
     def _heal_locator(self, by, locator, element_name):
         """Attempt to heal broken locator"""
         try:
-            # Record original failed locator
-            cursor = self.db_conn.cursor()
-            cursor.execute('''
-                INSERT INTO locators (
-                    element_name,
-                    locator_type,
-                    locator_value,
-                    page_url
-                ) VALUES (?, ?, ?, ?)
-            ''', (
-                element_name or self.current_test_name,
-                str(by),
-                str(locator),
-                self.driver.current_url
-            ))
-            original_locator_id = cursor.lastrowid
-            self.db_conn.commit()
-
-            alternative_strategies = [
-                (By.ID, locator),
-                (By.NAME, locator),
-                (By.CLASS_NAME, locator),
-                (By.CSS_SELECTOR, f"#{locator}"),
-                (By.CSS_SELECTOR, f".{locator}"),
-                (By.XPATH, f"//*[@id='{locator}']"),
-                (By.XPATH, f"//*[@name='{locator}']"),
-                (By.XPATH, f"//*[contains(@class, '{locator}')]")
-            ]
-
-            for alt_by, alt_locator in alternative_strategies:
+            # The original failed locator is recorded together with the healing result
+            original = (element_name or self.current_test_name, str(by), str(locator), self.driver.current_url)
+            strategies = alternative_strategies(locator)
+
+            healed = None
+            if self.probe_in_browser:
                 try:
-                    element = self.driver.find_element(alt_by, alt_locator)
-
-                    # Record successful healing
-                    cursor.execute('''
-                        INSERT INTO healing_results (
-                            original_locator_id,
-                            healed_locator_type,
-                            healed_locator_value,
-                            similarity_score,
-                            status
-                        ) VALUES (?, ?, ?, ?, ?)
-                    ''', (
-                        original_locator_id,
-                        str(alt_by),
-                        str(alt_locator),
-                        0.8,
-                        "SUCCESS"
-                    ))
-                    self.db_conn.commit()
-                    return element
-                except:
-                    continue
+                    healed = probe(self.driver, strategies)
+                except Exception as e:
+                    logging.debug(f"In-browser probe failed, trying strategies one by one: {str(e)}")
+                    healed = self._heal_sequential(strategies)
+            else:
+                healed = self._heal_sequential(strategies)
+
+            if healed:
+                alt_by, alt_locator, element, score = healed
+
+                # Record successful healing
+                self.telemetry.record_healing(*original, str(alt_by), str(alt_locator), score, "SUCCESS")
+                if self.healed_cache is not None:
+                    key = self.healed_cache.key(original[3], *original[:3])
+                    self.healed_cache.put(key, alt_by, alt_locator, score)
+                return element
 
             # Record failed healing attempt
-            cursor.execute('''
-                INSERT INTO healing_results (
-                    original_locator_id,
-                    healed_locator_type,
-                    healed_locator_value,
-                    similarity_score,
-                    status
-                ) VALUES (?, ?, ?, ?, ?)
-            ''', (
-                original_locator_id,
-                str(by),
-                str(locator),
-                0.0,
-                "FAILED"
-            ))
-            self.db_conn.commit()
+            self.telemetry.record_healing(*original, str(by), str(locator), 0.0, "FAILED")
             return None
 
         except Exception as e:
             logging.error(f"Error in healing process: {str(e)}")
             return None
 
+    def _heal_sequential(self, strategies):
+        """First strategy WebDriver can find, one round trip per strategy"""
+        for (alt_by, alt_locator), score in zip(strategies, STRATEGY_SCORES):
+            try:
+                return alt_by, alt_locator, self.driver.find_element(alt_by, alt_locator), score
+            except:
+                continue
+        return None
+
+@pytest.fixture(scope="session")
+def telemetry():
+    """Batched background writer for locator events, drained at session end"""
+    writer = LocatorTelemetryWriter(Path('healenium.db'))
+    yield writer
+    writer.close()
+
+
 @pytest.fixture(scope="session")
-def db_connection():
-    """Create and maintain database connection"""
-    db_path = Path('healenium.db')
-    conn = sqlite3.connect(str(db_path))
-    yield conn
-    conn.close()
+def healed_cache():
+    """Healed locators remembered across runs, saved at session end"""
+    cache = HealedLocatorCache(Path('healed_locators.json'))
+    yield cache
+    cache.save()
+    logging.info(f"Healed locator cache: {cache.stats()}")
 
 
 @pytest.fixture
-def healenium(request, db_connection):
+def healenium(request, telemetry, healed_cache):
     """Setup WebDriver with Healenium capabilities"""
     # Setup Chrome options
     chrome_options = Options()
@@ -158,7 +158,7 @@ def healenium(request, db_connection):
         driver.maximize_window()
 
         # Create Healenium test case
-        healenium_test = HealeniumTestCase(driver, db_connection)
+        healenium_test = HealeniumTestCase(driver, telemetry, healed_cache)
         healenium_test.current_test_name = request.node.name
 
         yield healenium_test
@@ -0,0 +1,121 @@
+import json
+import logging
+import os
+import re
+import time
+from urllib.parse import urlsplit
+
+# Path segments that are record ids rather than page names: numbers, hex hashes, UUIDs
+_ID_SEGMENT = re.compile(r'^(\d+|[0-9a-fA-F]{12,}|[0-9a-fA-F-]{36})$')
+
+
+def page_pattern(url):
+    """Page URL without query, fragment or id-like path segments, e.g. /orders/1234?tab=2 -> /orders/*"""
+    parts = urlsplit(url or '')
+    path = '/'.join('*' if _ID_SEGMENT.match(segment) else segment for segment in parts.path.split('/'))
+    return f"{parts.netloc}{path}"
+
+
+class HealedLocatorCache:
+    """Last known-good healed locator per (page pattern, element, original locator).
+
+    Kept as a JSON file so later runs try the healed locator first and skip
+    both the broken original and the alternative strategies. An entry that
+    no longer finds its element, or has not been used for `max_age_days`,
+    is dropped and the element is healed again. `healed` answers from the
+    entries' (element, by, locator) alone, so callers can skip looking up
+    the page URL for locators that never broke. `stats` covers lookups of
+    cached keys only; locators that never broke are not counted.
+    """
+
+    def __init__(self, path='healed_locators.json', max_age_days=30):
+        self.path = str(path)
+        self.max_age = max_age_days * 86400
+        self.entries = {}
+        self.elements = {}  # (element, by, locator) -> number of entries, over all pages
+        self.lookups = 0  # get() calls that found an entry
+        self.hits = 0
+        self.stale = 0
+        self.dirty = False
+        self.load()
+
+    @staticmethod
+    def key(page_url, element_name, by, locator):
+        return json.dumps([page_pattern(page_url), element_name, str(by), str(locator)])
+
+    @staticmethod
+    def _element(key):
+        return tuple(json.loads(key)[1:])
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)
+        except FileNotFoundError:
+            self.entries = {}
+        except Exception as e:
+            logging.error(f"Error loading healed locator cache: {str(e)}")
+            self.entries = {}
+        self.elements = {}
+        for key in self.entries:
+            element = self._element(key)
+            self.elements[element] = self.elements.get(element, 0) + 1
+
+    def healed(self, element_name, by, locator):
+        """True if this locator has a healed entry on any page"""
+        return (element_name, str(by), str(locator)) in self.elements
+
+    def save(self):
+        if not self.dirty:
+            return
+        tmp = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self.entries, f, indent=1)
+        os.replace(tmp, self.path)
+        self.dirty = False
+
+    def get(self, key):
+        """(by, locator) of the healed locator for `key`, or None"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        self.lookups += 1
+        if time.time() - entry['last_used'] > self.max_age:
+            self.invalidate(key)
+            return None
+        return entry['by'], entry['locator']
+
+    def put(self, key, by, locator, score):
+        if key not in self.entries:
+            element = self._element(key)
+            self.elements[element] = self.elements.get(element, 0) + 1
+        self.entries[key] = {'by': str(by), 'locator': str(locator), 'score': score,
+                             'hits': 0, 'last_used': time.time()}
+        self.dirty = True
+
+    def hit(self, key):
+        """The cached locator found its element"""
+        entry = self.entries[key]
+        entry['hits'] += 1
+        entry['last_used'] = time.time()
+        self.hits += 1
+        self.dirty = True
+
+    def invalidate(self, key):
+        """The cached locator no longer works (or expired); forget it"""
+        if self.entries.pop(key, None) is not None:
+            element = self._element(key)
+            self.elements[element] -= 1
+            if not self.elements[element]:
+                del self.elements[element]
+            self.stale += 1
+            self.dirty = True
+
+    def stats(self):
+        return {
+            'entries': len(self.entries),
+            'lookups': self.lookups,
+            'hits': self.hits,
+            'stale': self.stale,
+            'hit_rate': self.hits / self.lookups if self.lookups else 0.0,
+        }
@@ -0,0 +1,63 @@
+from selenium.webdriver.common.by import By
+
+# Evaluates every [by, value, score] candidate in the page and returns the best
+# match as [index, element, score], or null. A candidate matching several
+# elements, or only hidden ones, scores lower; invalid selectors are skipped.
+PROBE_SCRIPT = '''
+const candidates = arguments[0];
+const visible = el => !!(el.offsetWidth || el.offsetHeight || el.getClientRects().length);
+const find = (by, value) => {
+    switch (by) {
+        case 'id': { const el = document.getElementById(value); return el ? [el] : []; }
+        case 'name': return Array.from(document.getElementsByName(value));
+        case 'class name': return Array.from(document.getElementsByClassName(value));
+        case 'css selector': return Array.from(document.querySelectorAll(value));
+        case 'xpath': {
+            const result = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            const nodes = [];
+            for (let i = 0; i < result.snapshotLength; i++) nodes.push(result.snapshotItem(i));
+            return nodes.filter(node => node.nodeType === Node.ELEMENT_NODE);
+        }
+    }
+    return [];
+};
+let best = null;
+candidates.forEach(([by, value, score], index) => {
+    let matches;
+    try { matches = find(by, value); } catch (e) { return; }
+    if (!matches.length) return;
+    const shown = matches.filter(visible);
+    const element = shown.length ? shown[0] : matches[0];
+    score *= (matches.length === 1 ? 1.0 : 0.8) * (shown.length ? 1.0 : 0.5);
+    if (best === null || score > best[2]) best = [index, element, score];
+});
+return best;
+'''
+
+# Base score of each alternative strategy, in the order they are tried
+STRATEGY_SCORES = (1.0, 0.95, 0.85, 1.0, 0.85, 1.0, 0.95, 0.7)
+
+
+def alternative_strategies(locator):
+    """Alternative (by, locator) pairs for a broken locator value"""
+    return [
+        (By.ID, locator),
+        (By.NAME, locator),
+        (By.CLASS_NAME, locator),
+        (By.CSS_SELECTOR, f"#{locator}"),
+        (By.CSS_SELECTOR, f".{locator}"),
+        (By.XPATH, f"//*[@id='{locator}']"),
+        (By.XPATH, f"//*[@name='{locator}']"),
+        (By.XPATH, f"//*[contains(@class, '{locator}')]")
+    ]
+
+
+def probe(driver, strategies, scores=STRATEGY_SCORES):
+    """Best matching strategy in one execute_script round trip: (by, locator, element, score) or None"""
+    candidates = [[by, value, score] for (by, value), score in zip(strategies, scores)]
+    best = driver.execute_script(PROBE_SCRIPT, candidates)
+    if not best:
+        return None
+    index, element, score = best
+    by, value = strategies[index]
+    return by, value, element, score
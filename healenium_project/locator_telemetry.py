@@ -0,0 +1,156 @@
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+_STOP = object()
+
+
+class LocatorTelemetryWriter:
+    """Background writer for locator and healing events.
+
+    `record_locator` and `record_healing` only put a tuple on a queue; a
+    writer thread with its own WAL-mode connection inserts the events in one
+    transaction per batch, once `batch_size` events are queued or
+    `flush_interval` seconds have passed. `close` drains the queue.
+    """
+
+    def __init__(self, db_path='healenium.db', batch_size=500, flush_interval=0.5):
+        self.db_path = str(db_path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.SimpleQueue()
+        self.events_written = 0
+        self.batches_written = 0
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='locator-telemetry', daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def record_locator(self, element_name, locator_type, locator_value, page_url):
+        """Queue a locator lookup"""
+        self.queue.put(('locator', element_name, locator_type, locator_value, page_url))
+
+    def record_healing(self, element_name, locator_type, locator_value, page_url,
+                       healed_type, healed_value, similarity_score, status):
+        """Queue a healing attempt together with the original locator it replaces"""
+        self.queue.put(('healing', element_name, locator_type, locator_value, page_url,
+                        healed_type, healed_value, similarity_score, status))
+
+    def flush(self):
+        """Block until every event queued so far is committed"""
+        done = threading.Event()
+        self.queue.put(done)
+        done.wait()
+
+    def close(self):
+        """Drain the queue, commit and stop the writer thread"""
+        self.queue.put(_STOP)
+        self._thread.join()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, isolation_level=None)  # Transactions are explicit, see _write
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS locators (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                element_name TEXT NOT NULL,
+                locator_type TEXT NOT NULL,
+                locator_value TEXT NOT NULL,
+                page_url TEXT,
+                screenshot_path TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        conn.execute('''
+            CREATE TABLE IF NOT EXISTS healing_results (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                original_locator_id INTEGER NOT NULL,
+                healed_locator_type TEXT NOT NULL,
+                healed_locator_value TEXT NOT NULL,
+                similarity_score FLOAT,
+                status TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (original_locator_id) REFERENCES locators (id)
+            )
+        ''')
+        return conn
+
+    def _write(self, conn, batch):
+        if conn is None:
+            return
+        written = 0
+        try:
+            conn.execute('BEGIN')
+            for event in batch:
+                # A bad event (e.g. a NULL element name) rolls back only itself
+                conn.execute('SAVEPOINT event')
+                try:
+                    cursor = conn.execute('''
+                        INSERT INTO locators (element_name, locator_type, locator_value, page_url)
+                        VALUES (?, ?, ?, ?)
+                    ''', event[1:5])
+                    if event[0] == 'healing':
+                        conn.execute('''
+                            INSERT INTO healing_results (
+                                original_locator_id,
+                                healed_locator_type,
+                                healed_locator_value,
+                                similarity_score,
+                                status
+                            ) VALUES (?, ?, ?, ?, ?)
+                        ''', (cursor.lastrowid,) + event[5:])
+                    written += 1
+                except sqlite3.Error as e:
+                    conn.execute('ROLLBACK TO event')
+                    logging.error(f"Error writing locator telemetry event {event}: {str(e)}")
+                conn.execute('RELEASE event')
+            conn.execute('COMMIT')
+        except Exception as e:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            logging.error(f"Error writing locator telemetry: {str(e)}")
+            return
+        self.events_written += written
+        self.batches_written += 1
+
+    def _run(self):
+        try:
+            conn = self._connect()
+        except Exception as e:
+            # Keep consuming so callers never block; events are dropped
+            logging.error(f"Error opening telemetry database: {str(e)}")
+            conn = None
+        self._ready.set()
+        batch, waiters = [], []
+        deadline = None
+        stopping = False
+
+        while not stopping:
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP:
+                stopping = True
+            elif isinstance(item, threading.Event):
+                waiters.append(item)
+            elif item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            # Flush on size, on time, or when someone is waiting for it
+            if batch and (stopping or waiters or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._write(conn, batch)
+                batch, deadline = [], None
+            for waiter in waiters:
+                waiter.set()
+            waiters = []
+
+        if conn is not None:
+            conn.close()
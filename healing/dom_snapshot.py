@@ -0,0 +1,220 @@
+import hashlib
+from collections import OrderedDict, namedtuple
+from html.parser import HTMLParser
+
+# lxml parses in C; without it the standard library parser is used
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# One parsed element: attrs is a dict, text its own whitespace-normalized text,
+# path the tag names from the root (e.g. 'html/body/form/input')
+DomElement = namedtuple('DomElement', ['tag', 'attrs', 'text', 'path'])
+
+# Attributes the snapshot is indexed by
+INDEXED = ('id', 'name', 'class', 'text', 'tag', 'path')
+
+MAX_TEXT = 100
+
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta',
+             'param', 'source', 'track', 'wbr'}
+
+# Tags that implicitly close an open element of the same tag (<p>a<p>b)
+SIBLING_TAGS = {'p', 'li', 'option', 'tr', 'td', 'th', 'dt', 'dd'}
+
+
+def page_key(page_source):
+    """Hash identifying a page source"""
+    return hashlib.sha1(page_source.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+def css_escape(ident):
+    """Escapes a value for use as a CSS identifier (class name, id), following CSS.escape"""
+    escaped = []
+    for i, ch in enumerate(ident):
+        code = ord(ch)
+        if code == 0:
+            escaped.append('\ufffd')
+        elif 0x01 <= code <= 0x1f or code == 0x7f or (ch.isdigit() and ch.isascii() and (
+                i == 0 or (i == 1 and ident[0] == '-'))):
+            escaped.append(f'\\{code:x} ')
+        elif i == 0 and ch == '-' and len(ident) == 1:
+            escaped.append('\\-')
+        elif code >= 0x80 or ch in '-_' or (ch.isascii() and ch.isalnum()):
+            escaped.append(ch)
+        else:
+            escaped.append('\\' + ch)
+    return ''.join(escaped)
+
+
+def css_string(value):
+    """Double-quoted CSS string, e.g. for attribute selectors"""
+    value = value.replace('\\', '\\\\').replace('"', '\\"')
+    return '"' + value.replace('\n', '\\a ').replace('\r', '\\d ').replace('\f', '\\c ') + '"'
+
+
+def _clean_text(parts):
+    return ' '.join(''.join(parts).split())[:MAX_TEXT]
+
+
+def _parse_lxml(page_source):
+    # Parsed as UTF-8 bytes: lxml rejects str input carrying an XML encoding
+    # declaration (XHTML pages)
+    try:
+        root = etree.fromstring(page_source.encode('utf-8', 'replace'), etree.HTMLParser(encoding='utf-8'))
+    except (ValueError, etree.LxmlError):
+        return _parse_stdlib(page_source)
+    if root is None:  # Nothing but comments or whitespace
+        return []
+
+    elements = []
+    paths = []
+    for event, el in etree.iterwalk(root, events=('start', 'end')):
+        if event == 'end':
+            paths.pop()
+            continue
+        if not isinstance(el.tag, str):  # Comments and processing instructions
+            paths.append(paths[-1])
+            continue
+        path = f"{paths[-1]}/{el.tag}" if paths else el.tag
+        paths.append(path)
+        parts = [el.text or ''] + [child.tail or '' for child in el]
+        elements.append(DomElement(el.tag, dict(el.attrib), _clean_text(parts), path))
+    return elements
+
+
+class _SnapshotParser(HTMLParser):
+    """html.parser fallback; closes unclosed tags the way browsers mostly do"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.elements = []
+        self.stack = []  # (position, tag, path, attrs, text parts)
+
+    def _open(self, tag, attrs):
+        # Reserve the element's slot so elements stay in document order
+        path = f"{self.stack[-1][2]}/{tag}" if self.stack else tag
+        self.elements.append(None)
+        return len(self.elements) - 1, tag, path, {k: v or '' for k, v in attrs}, []
+
+    def _close(self, entry):
+        position, tag, path, attrs, parts = entry
+        self.elements[position] = DomElement(tag, attrs, _clean_text(parts), path)
+
+    def handle_starttag(self, tag, attrs):
+        if tag in SIBLING_TAGS and self.stack and self.stack[-1][1] == tag:
+            self._close(self.stack.pop())
+        entry = self._open(tag, attrs)
+        if tag in VOID_TAGS:
+            self._close(entry)
+        else:
+            self.stack.append(entry)
+
+    def handle_startendtag(self, tag, attrs):
+        self._close(self._open(tag, attrs))
+
+    def handle_endtag(self, tag):
+        if not any(entry[1] == tag for entry in self.stack):
+            return
+        while self.stack:
+            entry = self.stack.pop()
+            self._close(entry)
+            if entry[1] == tag:
+                break
+
+    def handle_data(self, data):
+        if self.stack:
+            self.stack[-1][4].append(data)
+
+    def close(self):
+        super().close()
+        while self.stack:
+            self._close(self.stack.pop())
+
+
+def _parse_stdlib(page_source):
+    parser = _SnapshotParser()
+    parser.feed(page_source)
+    parser.close()
+    return parser.elements
+
+
+class DomSnapshot:
+    """Page source parsed once into elements and an index per attribute.
+
+    `find('id', 'email')`, `find('class', 'btn')` (class tokens),
+    `find('text', 'sign in')` (lower-cased own text), `find('name', ...)`,
+    `find('tag', 'input')` and `find('path', 'html/body/form/input')` are
+    dictionary lookups.
+    """
+
+    def __init__(self, page_source, parser=None, key=None):
+        self.key = key if key is not None else page_key(page_source)
+        parse = parser or (_parse_lxml if etree is not None else _parse_stdlib)
+        self.elements = parse(page_source) if page_source.strip() else []
+        self.index = {attr: {} for attr in INDEXED}
+        for position, element in enumerate(self.elements):
+            for attr, value in self._keys(element):
+                self.index[attr].setdefault(value, []).append(position)
+
+    @staticmethod
+    def _keys(element):
+        yield 'tag', element.tag
+        yield 'path', element.path
+        if element.attrs.get('id'):
+            yield 'id', element.attrs['id']
+        if element.attrs.get('name'):
+            yield 'name', element.attrs['name']
+        for token in set(element.attrs.get('class', '').split()):
+            yield 'class', token
+        if element.text:
+            yield 'text', element.text.lower()
+
+    def find(self, attr, value):
+        """Elements whose `attr` is `value`, in document order"""
+        return [self.elements[position] for position in self.index[attr].get(value, ())]
+
+    def values(self, attr):
+        """Distinct values of an indexed attribute"""
+        return list(self.index[attr])
+
+    def selector(self, element):
+        """CSS selector for an element: by id, else name, else tag and classes"""
+        if element.attrs.get('id'):
+            return f"[id={css_string(element.attrs['id'])}]"
+        tag = css_escape(element.tag)
+        if element.attrs.get('name'):
+            return f"{tag}[name={css_string(element.attrs['name'])}]"
+        classes = ''.join(f".{css_escape(token)}" for token in element.attrs.get('class', '').split())
+        return f"{tag}{classes}"
+
+    def candidates(self):
+        """(value, CSS selector) for every id and class token on the page"""
+        pairs = [(value, f"[id={css_string(value)}]") for value in self.index['id']]
+        pairs += [(value, f".{css_escape(value)}") for value in self.index['class']]
+        return pairs
+
+
+class DomSnapshotCache:
+    """Snapshots of the most recent page sources, keyed by a hash of the source."""
+
+    def __init__(self, maxsize=16):
+        self.maxsize = maxsize
+        self.snapshots = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, page_source):
+        key = page_key(page_source)
+        snapshot = self.snapshots.get(key)
+        if snapshot is not None:
+            self.snapshots.move_to_end(key)
+            self.hits += 1
+            return snapshot
+
+        self.misses += 1
+        snapshot = self.snapshots[key] = DomSnapshot(page_source, key=key)
+        if len(self.snapshots) > self.maxsize:
+            self.snapshots.popitem(last=False)
+        return snapshot
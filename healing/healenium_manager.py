@@ -1,3 +1,4 @@
+import os
 import sys
 import sqlite3
 from datetime import datetime
@@ -6,12 +7,12 @@ from PyQt5.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                              QLabel, QComboBox, QTabWidget, QTextEdit, QMessageBox)
 from PyQt5.QtCore import Qt, QTimer
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-import re
 from selenium import webdriver
 from selenium.webdriver.common.by import By
 
+from dom_snapshot import DomSnapshotCache
+from locator_index import LocatorIndex, site_of
+
 
 class HealeniumDB:
     def __init__(self):
@@ -51,39 +52,45 @@ class HealeniumDB:
 
 
 class LocatorHealer:
-    def __init__(self):
-        self.vectorizer = TfidfVectorizer()
-
-    def find_alternative_locators(self, original_locator, page_source):
+    def __init__(self, index_dir='cache/locator_index', top_k=10, threshold=0.6):
+        self.snapshots = DomSnapshotCache()
+        self.index_dir = index_dir
+        self.indexes = {}  # site -> LocatorIndex
+        self.top_k = top_k
+        # Minimum n-gram cosine similarity. Reordered or re-cased locators score 1.0
+        # and one added or dropped word ~0.7-0.9; below 0.6 mostly shares a word only
+        self.threshold = threshold
+
+    def _index(self, page_url):
+        """Persistent n-gram index of the page's site, loaded on first use"""
+        site = site_of(page_url)
+        if site not in self.indexes:
+            path = os.path.join(self.index_dir, f"{site.replace(':', '_')}.npz") if self.index_dir else None
+            self.indexes[site] = LocatorIndex(path)
+        return self.indexes[site]
+
+    def find_alternative_locators(self, original_locator, page_source, page_url=None):
         """Find alternative locators using ML-based similarity matching"""
-        # Extract all potential elements from page source
-        potential_elements = self._extract_elements(page_source)
-
-        # Vectorize and compare similarity
-        vectors = self.vectorizer.fit_transform([original_locator] + potential_elements)
-        similarity_matrix = cosine_similarity(vectors[0:1], vectors[1:])
-
-        # Get top matches
-        alternatives = []
-        for idx, score in enumerate(similarity_matrix[0]):
-            if score > 0.7:  # Threshold for similarity
-                alternatives.append({
-                    'locator': potential_elements[idx],
-                    'score': float(score)
-                })
-
-        return sorted(alternatives, key=lambda x: x['score'], reverse=True)
+        snapshot = self.snapshots.get(page_source)
 
-    def _extract_elements(self, page_source):
-        """Extract potential elements from page source"""
-        # This is a simplified version - in practice, you'd want more sophisticated parsing
-        id_pattern = r'id="([^"]*)"'
-        class_pattern = r'class="([^"]*)"'
+        # Elements whose id, name, class or text is exactly the locator need no scoring
+        alternatives = {}
+        for attr in ('id', 'name', 'class', 'text'):
+            value = original_locator.lower() if attr == 'text' else original_locator
+            for element in snapshot.find(attr, value):
+                selector = snapshot.selector(element)
+                alternatives[selector] = {
+                    'locator': original_locator,
+                    'selector': selector,
+                    'score': 1.0
+                }
 
-        ids = re.findall(id_pattern, page_source)
-        classes = re.findall(class_pattern, page_source)
+        # Top matches by character n-gram TF-IDF similarity
+        for match in self._index(page_url).query(snapshot, original_locator, k=self.top_k,
+                                                 threshold=self.threshold):
+            alternatives.setdefault(match['selector'], match)
 
-        return ids + classes
+        return sorted(alternatives.values(), key=lambda x: x['score'], reverse=True)
 
 
 class HealeniumGUI(QMainWindow):
@@ -243,13 +250,13 @@ class HealeniumTestRunner:
                 except:
                     # If original fails, try to heal
                     page_source = driver.page_source
-                    alternatives = self.healer.find_alternative_locators(step.locator, page_source)
+                    alternatives = self.healer.find_alternative_locators(step.locator, page_source, driver.current_url)
 
                     if alternatives:
                         # Try alternative locators
                         for alt in alternatives:
                             try:
-                                element = driver.find_element(By.CSS_SELECTOR, alt['locator'])
+                                element = driver.find_element(By.CSS_SELECTOR, alt['selector'])
 
                                 # Store healing result
                                 cursor = self.db.conn.cursor()
@@ -258,7 +265,7 @@ class HealeniumTestRunner:
                                     (original_locator_id, healed_locator_type, healed_locator_value,
                                      similarity_score, status, created_at)
                                     VALUES (?, ?, ?, ?, ?, ?)
-                                ''', (step.locator_id, "CSS", alt['locator'],
+                                ''', (step.locator_id, "CSS", alt['selector'],
                                       alt['score'], "SUCCESS", datetime.now()))
                                 self.db.conn.commit()
 
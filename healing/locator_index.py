@@ -0,0 +1,200 @@
+import atexit
+import os
+import re
+import time
+from collections import Counter, OrderedDict
+from urllib.parse import urlsplit
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+NGRAM_RANGE = (2, 4)
+
+# Bumped whenever the analyzer changes; indexes saved by another version are refitted
+ANALYZER_VERSION = 2
+
+
+def split_locator(value):
+    """Locator value as lower-case words: 'searchInput', 'search-input' and 'search_input' all give 'search input'"""
+    value = re.sub(r'([a-z0-9])([A-Z])', r'\1 \2', value)
+    return re.sub(r'[\W_]+', ' ', value).lower().strip()
+
+
+def site_of(page_url):
+    """Host a page belongs to; pages of one site share an index"""
+    return urlsplit(page_url or '').netloc or 'default'
+
+
+class LocatorIndex:
+    """Character n-gram TF-IDF index of one site's locator values.
+
+    The n-gram vocabulary and document frequencies grow incrementally: each
+    distinct locator value is one document, counted the first time any page
+    shows it, so repeat pages fit nothing. Values are split into words first
+    (`split_locator`), so n-grams stay within words and reordered or
+    re-cased locators ('input-search', 'searchInput') still score high.
+    Scores equal TfidfVectorizer(analyzer='char_wb', preprocessor=split_locator)
+    + cosine_similarity fitted on the distinct values the site has shown so
+    far. Every page snapshot keeps its candidates' raw n-gram counts and a
+    sparse, L2-normalized TF-IDF element x n-gram matrix in CSC form, i.e.
+    one posting list per n-gram, re-weighted with the current IDF whenever
+    the vocabulary has changed since. `query` only touches the posting lists
+    of the query's n-grams, so its cost depends on how many elements share
+    n-grams with the locator rather than on page size. `path` persists the
+    vocabulary across runs, written at most every `save_interval` seconds
+    and at exit.
+    """
+
+    def __init__(self, path=None, ngram_range=NGRAM_RANGE, max_snapshots=16, save_interval=60):
+        self.path = path
+        self.save_interval = save_interval
+        self.saved_at = time.monotonic()
+        self.dirty = False
+        self.fits = 0  # Vocabulary updates so far; snapshots weighted at another count are re-weighted
+        self.analyzer = TfidfVectorizer(analyzer='char_wb', ngram_range=ngram_range,
+                                        preprocessor=split_locator).build_analyzer()
+        self.vocabulary = {}
+        self.df = np.zeros(0, dtype=np.int64)
+        self.seen = set()
+        self.idf = np.zeros(0)
+        self.max_snapshots = max_snapshots
+        self.snapshots = OrderedDict()  # page key -> [candidates, counts, matrix, fits]
+        if path is not None:
+            if os.path.exists(path):
+                self.load()
+            atexit.register(self.flush)
+
+    @property
+    def n_documents(self):
+        return len(self.seen)
+
+    def load(self):
+        with np.load(self.path) as saved:
+            if 'version' not in saved.files or int(saved['version']) != ANALYZER_VERSION:
+                return
+            ngrams = saved['ngrams'].tolist()
+            self.df = saved['df']
+            self.seen = set(saved['values'].tolist())
+        self.vocabulary = {gram: col for col, gram in enumerate(ngrams)}
+        self._update_idf()
+
+    def save(self):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp = f'{self.path}.{os.getpid()}.tmp.npz'
+        np.savez_compressed(tmp, ngrams=np.array(list(self.vocabulary), dtype=str),
+                            df=self.df, values=np.array(sorted(self.seen), dtype=str),
+                            version=ANALYZER_VERSION)
+        os.replace(tmp, self.path)
+        self.saved_at = time.monotonic()
+        self.dirty = False
+
+    def flush(self):
+        """Saves the vocabulary if it changed since the last save"""
+        if self.dirty:
+            self.save()
+
+    def _update_idf(self):
+        # Smoothed IDF, as TfidfVectorizer computes it
+        self.idf = np.log((1 + self.n_documents) / (1 + self.df)) + 1
+
+    def _counts(self, values):
+        return [Counter(self.analyzer(value)) for value in values]
+
+    def partial_fit(self, values, counts=None):
+        """Adds values not seen before to the vocabulary and document frequencies; returns True if any were new"""
+        counts = counts or self._counts(values)
+        new = {value: grams for value, grams in zip(values, counts) if value not in self.seen}
+        if not new:
+            return False
+        df = Counter()
+        for grams in new.values():
+            df.update(grams.keys())
+        for gram in df:
+            self.vocabulary.setdefault(gram, len(self.vocabulary))
+        counts = np.zeros(len(self.vocabulary), dtype=np.int64)
+        counts[:len(self.df)] = self.df
+        np.add.at(counts, [self.vocabulary[gram] for gram in df], list(df.values()))
+        self.df = counts
+        self.seen.update(new)
+        self._update_idf()
+        self.fits += 1
+        return True
+
+    def _count_matrix(self, values, counts=None):
+        """Raw n-gram counts (CSR) for values; n-grams outside the vocabulary are dropped"""
+        indptr, indices, data = [0], [], []
+        for grams in counts or self._counts(values):
+            for gram, tf in grams.items():
+                col = self.vocabulary.get(gram)
+                if col is not None:
+                    indices.append(col)
+                    data.append(tf)
+            indptr.append(len(indices))
+        return sparse.csr_matrix((np.array(data, dtype=np.float64), indices, indptr),
+                                 shape=(len(values), len(self.vocabulary)))
+
+    def _weigh(self, matrix):
+        """L2-normalized TF-IDF rows of a count matrix, with the current IDF"""
+        matrix = matrix @ sparse.diags(self.idf[:matrix.shape[1]])
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1
+        return sparse.diags(1 / norms) @ matrix
+
+    def transform(self, values, counts=None):
+        """L2-normalized TF-IDF rows (CSR) for values; n-grams outside the vocabulary are dropped"""
+        return self._weigh(self._count_matrix(values, counts)).tocsr()
+
+    def _query_vector(self, text):
+        # N-grams outside the vocabulary are dropped before normalizing, as TfidfVectorizer.transform does
+        cols, weights = [], []
+        for gram, tf in Counter(self.analyzer(text)).items():
+            col = self.vocabulary.get(gram)
+            if col is not None:
+                cols.append(col)
+                weights.append(tf * self.idf[col])
+        weights = np.array(weights)
+        return np.array(cols, dtype=np.int64), weights / (np.sqrt(weights @ weights) or 1)
+
+    def add_snapshot(self, snapshot):
+        """Indexes a DomSnapshot's candidates, once per page; returns (candidates, CSC TF-IDF matrix)"""
+        entry = self.snapshots.get(snapshot.key)
+        if entry is not None:
+            self.snapshots.move_to_end(snapshot.key)
+        else:
+            candidates = snapshot.candidates()
+            values = [value for value, _ in candidates]
+            counts = self._counts(values)
+            if self.partial_fit(values, counts) and self.path is not None:
+                self.dirty = True
+                if time.monotonic() - self.saved_at >= self.save_interval:
+                    self.save()
+            # The page's n-grams are all in the vocabulary now; later columns never match it
+            entry = self.snapshots[snapshot.key] = [candidates, self._count_matrix(values, counts), None, None]
+            if len(self.snapshots) > self.max_snapshots:
+                self.snapshots.popitem(last=False)
+
+        if entry[3] != self.fits:
+            entry[2], entry[3] = self._weigh(entry[1]).tocsc(), self.fits
+        return entry[0], entry[2]
+
+    def query(self, snapshot, text, k=5, threshold=0.0):
+        """Top-k candidates of a snapshot by cosine similarity to `text`, best first"""
+        candidates, postings = self.add_snapshot(snapshot)
+        cols, weights = self._query_vector(text)
+        known = cols < postings.shape[1]  # n-grams added after this page was indexed match nothing here
+        cols, weights = cols[known], weights[known]
+        if not len(cols):
+            return []
+
+        # Accumulate scores over the posting lists of the query's n-grams only
+        hits = postings[:, cols]
+        contributions = hits.data * np.repeat(weights, np.diff(hits.indptr))
+        scores = np.bincount(hits.indices, weights=contributions)
+
+        elements = np.flatnonzero(scores > threshold)
+        if len(elements) > k:
+            elements = elements[np.argpartition(-scores[elements], k - 1)[:k]]
+        elements = elements[np.argsort(-scores[elements], kind='stable')]
+        return [{'locator': candidates[i][0], 'selector': candidates[i][1], 'score': float(scores[i])}
+                for i in elements]
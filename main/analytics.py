@@ -0,0 +1,202 @@
+import pandas as pd
+import numpy as np
+
+# Every function below takes one equity curve (T,) or a batch of them (K, T),
+# with time on the last axis, and returns a scalar or a (K,) array. Curves
+# shorter than 2 points have no returns; their summary metrics are NaN.
+
+
+def _too_short(equity):
+    """NaN for each curve, as a scalar for a single curve."""
+    return np.full(equity.shape[:-1], np.nan)[()]
+
+
+def bar_returns(equity):
+    """Simple per-bar returns; the first bar's return is 0."""
+    equity = np.asarray(equity, dtype=np.float64)
+    returns = np.zeros_like(equity)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns[..., 1:] = equity[..., 1:] / equity[..., :-1] - 1
+    return returns
+
+
+def total_return(equity):
+    equity = np.asarray(equity, dtype=np.float64)
+    if equity.shape[-1] < 2:
+        return _too_short(equity)
+    return (equity[..., -1] / equity[..., 0] - 1) * 100
+
+
+def cagr(equity, periods_per_year=252):
+    """Compound annual growth rate in percent."""
+    equity = np.asarray(equity, dtype=np.float64)
+    if equity.shape[-1] < 2:
+        return _too_short(equity)
+    years = (equity.shape[-1] - 1) / periods_per_year
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return ((equity[..., -1] / equity[..., 0]) ** (1 / years) - 1) * 100
+
+
+def volatility(equity, periods_per_year=252):
+    """Annualized standard deviation of bar returns, in percent."""
+    equity = np.asarray(equity, dtype=np.float64)
+    if equity.shape[-1] < 2:
+        return _too_short(equity)
+    return bar_returns(equity)[..., 1:].std(axis=-1, ddof=1) * np.sqrt(periods_per_year) * 100
+
+
+def sharpe_ratio(equity, periods_per_year=252, risk_free=0.0):
+    """Annualized Sharpe ratio; `risk_free` is an annual rate (0.06 for 6%)."""
+    equity = np.asarray(equity, dtype=np.float64)
+    if equity.shape[-1] < 2:
+        return _too_short(equity)
+    excess = bar_returns(equity)[..., 1:] - risk_free / periods_per_year
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return excess.mean(axis=-1) / excess.std(axis=-1, ddof=1) * np.sqrt(periods_per_year)
+
+
+def sortino_ratio(equity, periods_per_year=252, risk_free=0.0):
+    """Annualized Sortino ratio, penalizing only returns below `risk_free`."""
+    equity = np.asarray(equity, dtype=np.float64)
+    if equity.shape[-1] < 2:
+        return _too_short(equity)
+    excess = bar_returns(equity)[..., 1:] - risk_free / periods_per_year
+    downside = np.sqrt(np.mean(np.minimum(excess, 0) ** 2, axis=-1))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return excess.mean(axis=-1) / downside * np.sqrt(periods_per_year)
+
+
+def drawdown(equity):
+    """Per-bar drawdown from the running peak, in percent."""
+    equity = np.asarray(equity, dtype=np.float64)
+    peaks = np.maximum.accumulate(equity, axis=-1)
+    return (peaks - equity) / peaks * 100
+
+
+def max_drawdown(equity):
+    equity = np.asarray(equity, dtype=np.float64)
+    if equity.shape[-1] < 2:
+        return _too_short(equity)
+    return drawdown(equity).max(axis=-1)
+
+
+def max_drawdown_duration(equity):
+    """Longest stretch, in bars, spent below a previous peak."""
+    equity = np.asarray(equity, dtype=np.float64)
+    if equity.shape[-1] < 2:
+        return _too_short(equity)
+    bars = np.arange(equity.shape[-1])
+    at_peak = equity >= np.maximum.accumulate(equity, axis=-1)
+    last_peak = np.maximum.accumulate(np.where(at_peak, bars, 0), axis=-1)
+    return (bars - last_peak).max(axis=-1)
+
+
+def calmar_ratio(equity, periods_per_year=252):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return cagr(equity, periods_per_year) / max_drawdown(equity)
+
+
+# Rolling Metrics
+def _rolling_sums(values, window):
+    """Sums over trailing windows along the last axis; NaN until a window is full."""
+    sums = np.cumsum(values, axis=-1)
+    out = np.full(values.shape, np.nan)
+    out[..., window - 1:] = sums[..., window - 1:]
+    out[..., window:] -= sums[..., :-window]
+    return out
+
+
+def rolling_return(equity, window):
+    equity = np.asarray(equity, dtype=np.float64)
+    out = np.full(equity.shape, np.nan)
+    out[..., window:] = (equity[..., window:] / equity[..., :-window] - 1) * 100
+    return out
+
+
+def _rolling_std(values, window):
+    """Sample standard deviation over trailing windows along the last axis; NaN until a window is full.
+
+    pandas' online update, rather than sums of squares minus the squared
+    sum, which cancels catastrophically on long series.
+    """
+    frame = pd.DataFrame(np.reshape(values, (-1, values.shape[-1])).T)
+    return frame.rolling(window).std().to_numpy().T.reshape(values.shape)
+
+
+def rolling_volatility(equity, window, periods_per_year=252):
+    """Annualized volatility of the last `window` bar returns, in percent."""
+    returns = bar_returns(equity)
+    return _rolling_std(returns, window) * np.sqrt(periods_per_year) * 100
+
+
+def rolling_sharpe(equity, window, periods_per_year=252):
+    """Annualized Sharpe ratio over the last `window` bar returns."""
+    returns = bar_returns(equity)
+    mean = _rolling_sums(returns, window) / window
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return mean / _rolling_std(returns, window) * np.sqrt(periods_per_year)
+
+
+# Trade Statistics
+def exposure(ledger, n_bars):
+    """Percent of bars with at least one position open, from a TRADE_DTYPE ledger."""
+    changes = np.zeros(n_bars + 1, dtype=np.int64)
+    np.add.at(changes, ledger['entry_index'], 1)
+    np.add.at(changes, ledger['exit_index'], -1)
+    return np.count_nonzero(np.cumsum(changes[:n_bars]) > 0) / n_bars * 100 if n_bars else 0.0
+
+
+def trade_stats(ledger):
+    """Win rate, payoff and holding statistics from a TRADE_DTYPE ledger."""
+    pnl = ledger['pnl']
+    wins = pnl[pnl > 0]
+    losses = pnl[pnl < 0]
+    holding = ledger['exit_index'] - ledger['entry_index']
+    gross_loss = -losses.sum()
+    return {
+        'total_trades': len(pnl),
+        'win_rate': len(wins) / len(pnl) * 100 if len(pnl) else 0.0,
+        'profit_factor': wins.sum() / gross_loss if gross_loss > 0 else np.inf if len(wins) else np.nan,
+        'avg_win': wins.mean() if len(wins) else 0.0,
+        'avg_loss': losses.mean() if len(losses) else 0.0,
+        'expectancy': pnl.mean() if len(pnl) else 0.0,
+        'avg_holding_bars': holding.mean() if len(pnl) else 0.0,
+        'max_consecutive_losses': _longest_run(pnl <= 0),
+    }
+
+
+def _longest_run(flags):
+    """Length of the longest run of True values."""
+    if not flags.any():
+        return 0
+    edges = np.diff(np.concatenate(([0], flags.astype(np.int8), [0])))
+    return int((np.flatnonzero(edges == -1) - np.flatnonzero(edges == 1)).max())
+
+
+# Tear Sheet
+def tear_sheet(equity, ledger=None, periods_per_year=252, risk_free=0.0):
+    """Full set of performance metrics for one equity curve or a batch of them.
+
+    A 1-D curve gives a dict, including trade statistics and exposure when its
+    `ledger` is passed. A 2-D (K, T) batch, e.g. stacked sweep results, gives a
+    DataFrame with one row per curve, computed without a Python loop.
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    metrics = {
+        'total_return': total_return(equity),
+        'cagr': cagr(equity, periods_per_year),
+        'volatility': volatility(equity, periods_per_year),
+        'sharpe': sharpe_ratio(equity, periods_per_year, risk_free),
+        'sortino': sortino_ratio(equity, periods_per_year, risk_free),
+        'max_drawdown': max_drawdown(equity),
+        'max_drawdown_duration': max_drawdown_duration(equity),
+        'calmar': calmar_ratio(equity, periods_per_year),
+    }
+    if equity.ndim > 1:
+        return pd.DataFrame(metrics)
+
+    metrics = {name: value.item() for name, value in metrics.items()}
+    if ledger is not None:
+        metrics.update(trade_stats(ledger))
+        metrics['exposure'] = exposure(ledger, len(equity))
+    return metrics
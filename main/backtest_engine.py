@@ -0,0 +1,169 @@
+import numpy as np
+
+
+# Signal Generation
+def crossover_signals(short_ma, long_ma, short_window):
+    """Buy (+1) / sell (-1) crossover signals, as built by MovingAverageCrossoverStrategy.generate_signals.
+
+    2-D (time x symbol) moving averages give one signal column per symbol.
+    """
+    signal = np.where(np.asarray(short_ma) > np.asarray(long_ma), 1.0, 0.0)
+    signal[:short_window] = 0.0
+    first = np.full((1,) + signal.shape[1:], np.nan)
+    return np.concatenate((first, np.diff(signal, axis=0)))[:len(signal)]
+
+
+# Trade Pairing
+def pair_trades(signal):
+    """Pairs buy (+1) and sell (-1) signals FIFO and returns entry and exit bar indices."""
+    signal = np.asarray(signal, dtype=float).ravel()
+
+    # Bar 0 is never traded, matching the per-bar loop which starts at 1
+    step = np.zeros(len(signal), dtype=np.int64)
+    step[1:][signal[1:] == 1.0] = 1
+    step[1:][signal[1:] == -1.0] = -1
+
+    # Open position count after each bar; sells with no open position are ignored,
+    # which is the running sum reflected at zero
+    running = np.cumsum(step)
+    open_count = running - np.minimum(np.minimum.accumulate(running), 0)
+    open_before = np.concatenate(([0], open_count[:-1]))
+
+    buys = np.flatnonzero(step == 1)
+    exits = np.flatnonzero((step == -1) & (open_before > 0))
+
+    # Every matched sell closes the oldest open buy
+    entries = buys[:len(exits)]
+    return buys, entries, exits
+
+
+# Trade Ledger
+TRADE_DTYPE = np.dtype([
+    ('entry_index', np.int64),
+    ('exit_index', np.int64),
+    ('entry_time', 'datetime64[ns]'),
+    ('exit_time', 'datetime64[ns]'),
+    ('entry_price', np.float64),
+    ('exit_price', np.float64),
+    ('quantity', np.int64),
+    ('pnl', np.float64),
+])
+
+
+def build_ledger(close, entries, exits, share_quantity, index=None):
+    """Fills a preallocated structured trade ledger, one row per closed trade."""
+    ledger = np.empty(len(exits), dtype=TRADE_DTYPE)
+    ledger['entry_index'] = entries
+    ledger['exit_index'] = exits
+    times = np.asarray(getattr(index, 'values', index)) if index is not None else None
+    if times is not None and np.issubdtype(times.dtype, np.datetime64):
+        ledger['entry_time'] = times[entries]
+        ledger['exit_time'] = times[exits]
+    else:
+        ledger['entry_time'] = np.datetime64('NaT')
+        ledger['exit_time'] = np.datetime64('NaT')
+    ledger['entry_price'] = close[entries]
+    ledger['exit_price'] = close[exits]
+    ledger['quantity'] = share_quantity
+    ledger['pnl'] = (ledger['exit_price'] - ledger['entry_price']) * share_quantity
+    return ledger
+
+
+def ledger_metrics(ledger, initial_capital=100000):
+    """Summary metrics and per-trade drawdowns computed from the ledger in bulk."""
+    profits = ledger['pnl']
+
+    # Capital after each sell, accumulated in the same order as the per-bar loop
+    capital_path = np.cumsum(np.concatenate(([initial_capital], profits)))[1:]
+    peaks = np.maximum.accumulate(np.maximum(capital_path, initial_capital))
+    trade_drawdowns = (peaks - capital_path) / peaks * 100
+
+    total_trades = len(profits)
+    winning_trades = int(np.count_nonzero(profits > 0))
+    losing_trades = total_trades - winning_trades
+    metrics = {
+        'total_trades': total_trades,
+        'winning_trades': winning_trades,
+        'losing_trades': losing_trades,
+        'win_rate': (winning_trades / total_trades) * 100 if total_trades > 0 else 0,
+        'total_profit': float(np.cumsum(profits)[-1]) if total_trades else 0.0,
+        'max_drawdown': float(trade_drawdowns.max()) if total_trades else 0,
+        'avg_profit': float(np.mean(profits[profits > 0])) if winning_trades > 0 else 0,
+        'avg_loss': float(np.mean(profits[profits < 0])) if losing_trades > 0 else 0,
+        'final_capital': float(capital_path[-1]) if total_trades else float(initial_capital),
+    }
+    return metrics, trade_drawdowns
+
+
+# Vectorized Backtest
+def run_backtest(close, signal, initial_capital=100000, share_quantity=10, index=None):
+    """Runs the crossover backtest in bulk array operations.
+
+    Returns a dict with the structured trade `ledger` (TRADE_DTYPE), the buy
+    bars, the per-trade drawdowns, the per-bar equity curve and drawdown, and
+    the summary metrics reported by MovingAverageCrossoverStrategy.backtest.
+    `index` (e.g. the data's DatetimeIndex) fills the ledger's trade times.
+    """
+    close = np.asarray(close, dtype=float).ravel()
+    buys, entries, exits = pair_trades(signal)
+    ledger = build_ledger(close, entries, exits, share_quantity, index)
+    metrics, trade_drawdowns = ledger_metrics(ledger, initial_capital)
+
+    # Per-bar equity: realized capital plus open positions marked to close
+    bars = np.arange(len(close))
+    buys_so_far = np.searchsorted(buys, bars, side='right')
+    exits_so_far = np.searchsorted(exits, bars, side='right')
+    buy_cost = np.concatenate(([0.0], np.cumsum(close[buys])))
+    realized = np.concatenate(([0.0], np.cumsum(ledger['pnl'])))
+    open_quantity = (buys_so_far - exits_so_far) * share_quantity
+    open_cost = (buy_cost[buys_so_far] - buy_cost[exits_so_far]) * share_quantity
+    equity = initial_capital + realized[exits_so_far] + open_quantity * close - open_cost
+    equity_peaks = np.maximum.accumulate(equity) if len(equity) else equity
+    drawdown = (equity_peaks - equity) / equity_peaks * 100
+
+    return {
+        'ledger': ledger,
+        'buys': buys,
+        'trade_drawdowns': trade_drawdowns,
+        'equity': equity,
+        'drawdown': drawdown,
+        'metrics': metrics,
+    }
+
+
+# Console Output
+def print_trade_log(close, buys, ledger, index):
+    """Prints every buy and every ledger trade's sell in bar order, one line each.
+
+    A bar can close several lots (stops) and open one after them, so sells
+    come from the ledger rows rather than from one entry per bar.
+    """
+    close = np.asarray(close, dtype=float).ravel()
+    buys = np.asarray(buys, dtype=np.int64)
+    exit_bars = ledger['exit_index'].tolist()
+    exit_prices = ledger['exit_price'].tolist()
+    pnls = ledger['pnl'].tolist()
+
+    # Stable sort: on a shared bar the sells (in ledger order) print before the buy
+    order = np.argsort(np.concatenate((ledger['exit_index'], buys)), kind='stable')
+    for k in order.tolist():
+        if k < len(exit_bars):
+            print(f"Selling at {exit_prices[k]} on {index[exit_bars[k]]}, Profit: {pnls[k]}")
+        else:
+            i = int(buys[k - len(exit_bars)])
+            print(f"Buying at {close[i]} on {index[i]}")
+
+
+def print_results(metrics, initial_capital):
+    """Prints the summary metrics of a backtest."""
+    print("\n=== Backtest Results ===")
+    print(f"Total Trades: {metrics['total_trades']}")
+    print(f"Winning Trades: {metrics['winning_trades']}")
+    print(f"Losing Trades: {metrics['losing_trades']}")
+    print(f"Win Rate: {metrics['win_rate']:.2f}%")
+    print(f"Total Profit: {metrics['total_profit']:.2f}")
+    print(f"Max Drawdown: {metrics['max_drawdown']:.2f}%")
+    print(f"Average Profit per Trade: {metrics['avg_profit']:.2f}")
+    print(f"Average Loss per Trade: {metrics['avg_loss']:.2f}")
+    print(f"Final capital after backtest: {metrics['final_capital']:.2f}")
+    print(f"Final Profit/Loss: {metrics['final_capital'] - initial_capital:.2f}")
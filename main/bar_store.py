@@ -0,0 +1,240 @@
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import numpy as np
+
+# NSE trading timezone; Dhan timestamps are epoch seconds
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# On-disk column layout, one raw little-endian file per column
+COLUMNS = {
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.int64,
+    'timestamp': np.int64,  # Written last; its length is the committed row count
+}
+
+# Compact layout: float32 prices (about 7 significant digits), uint32 volume
+COMPACT_COLUMNS = {
+    'open': np.float32,
+    'high': np.float32,
+    'low': np.float32,
+    'close': np.float32,
+    'volume': np.uint32,
+    'timestamp': np.int64,
+}
+
+
+def day_start(date):
+    """Epoch seconds of IST midnight for a 'YYYY-MM-DD' date."""
+    return int(datetime.strptime(date, '%Y-%m-%d').replace(tzinfo=IST).timestamp())
+
+
+def epoch_to_index(timestamps):
+    """Vectorized epoch-seconds to naive IST DatetimeIndex."""
+    index = pd.to_datetime(np.asarray(timestamps, dtype=np.int64), unit='s', utc=True)
+    return index.tz_convert(IST).tz_localize(None).rename('timestamp')
+
+
+def index_to_epoch(index):
+    """Naive IST (or tz-aware) DatetimeIndex to epoch seconds."""
+    index = pd.DatetimeIndex(index)
+    if index.tz is None:
+        index = index.tz_localize(IST)
+    return index.as_unit('s').asi8
+
+
+def cast_column(values, dtype):
+    """Casts a column to its storage dtype, refusing integers that would wrap."""
+    values = np.asarray(values)
+    dtype = np.dtype(dtype)
+    if dtype.kind in 'iu' and len(values):
+        limits = np.iinfo(dtype)
+        if values.min() < limits.min or values.max() > limits.max:
+            raise ValueError(f"Values outside the {dtype} range: {values.min()}..{values.max()}")
+    return values.astype(dtype, copy=False)
+
+
+# Compact Bar Container
+class CompactBars:
+    """Columnar bars backed by NumPy (usually memory-mapped) arrays.
+
+    Columns are read with `bars['close']` like a DataFrame, and `bars.index`
+    gives the IST DatetimeIndex, so MovingAverageCrossoverStrategy can run on
+    it directly. Slicing (`bars[a:b]`) returns views.
+    """
+
+    def __init__(self, columns):
+        self.columns = columns
+
+    @classmethod
+    def from_frame(cls, frame, dtypes=COMPACT_COLUMNS):
+        """Compact copy of an OHLCV DataFrame indexed by timestamp."""
+        columns = {name: cast_column(frame[name].to_numpy(), dtype)
+                   for name, dtype in dtypes.items() if name != 'timestamp'}
+        columns['timestamp'] = index_to_epoch(frame.index).astype(dtypes['timestamp'])
+        return cls(columns)
+
+    def __len__(self):
+        return len(self.columns['timestamp'])
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            return CompactBars({name: values[key] for name, values in self.columns.items()})
+        return self.columns[key]
+
+    @property
+    def index(self):
+        return epoch_to_index(self.columns['timestamp'])
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in self.columns.values())
+
+    def to_frame(self):
+        """Materializes a float64 DataFrame in the fetch_data layout."""
+        return pd.DataFrame({name: np.asarray(values, dtype=np.float64 if name != 'volume' else np.int64)
+                             for name, values in self.columns.items() if name != 'timestamp'},
+                            index=self.index)
+
+
+# Local Bar Store
+class BarStore:
+    """Memory-mapped columnar OHLCV store keyed by securityId/segment/interval.
+
+    Bars live under `root/<segment>/<security_id>/<interval>/` as one raw
+    NumPy file per column. `sync` downloads only the bars missing after the
+    last stored day; `load` memory-maps the columns without network access.
+    Pass `columns=COMPACT_COLUMNS` to store new datasets as float32/uint32.
+    """
+
+    def __init__(self, root='data', columns=COLUMNS):
+        self.root = root
+        self.columns = columns  # Layout for new datasets; existing ones keep theirs
+
+    def _path(self, security_id, exchange_segment, interval):
+        return os.path.join(self.root, exchange_segment, str(security_id), interval)
+
+    def _read_meta(self, path):
+        try:
+            with open(os.path.join(path, 'meta.json')) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _write_meta(self, path, meta):
+        tmp = os.path.join(path, 'meta.json.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, os.path.join(path, 'meta.json'))
+
+    def _layout(self, path, meta=None):
+        """Column dtypes of a dataset: as recorded in its meta, else the store's layout."""
+        meta = self._read_meta(path) if meta is None else meta
+        if 'columns' in meta:
+            return {column: np.dtype(dtype) for column, dtype in meta['columns'].items()}
+        if os.path.exists(os.path.join(path, 'timestamp.bin')):
+            return COLUMNS  # Written before layouts were recorded
+        return self.columns
+
+    def _length(self, path):
+        try:
+            return os.path.getsize(os.path.join(path, 'timestamp.bin')) // np.dtype(np.int64).itemsize
+        except FileNotFoundError:
+            return 0
+
+    def _read_column(self, path, column, length, layout=COLUMNS):
+        if length == 0:
+            return np.empty(0, dtype=layout[column])
+        return np.memmap(os.path.join(path, f'{column}.bin'), dtype=layout[column], mode='r', shape=(length,))
+
+    def _write(self, path, arrays, keep_rows, layout):
+        """Truncates every column to `keep_rows` and appends `arrays`."""
+        os.makedirs(path, exist_ok=True)
+        for column, dtype in layout.items():
+            filename = os.path.join(path, f'{column}.bin')
+            with open(filename, 'ab') as f:
+                f.truncate(keep_rows * np.dtype(dtype).itemsize)
+                f.write(np.ascontiguousarray(arrays[column]).tobytes())
+
+    def missing_from(self, security_id, start_date, end_date, exchange_segment='NSE_EQ', interval='1d'):
+        """First date to download so the store covers `start_date`..`end_date`.
+
+        When the store already covers `start_date` this is the last stored day,
+        which is re-fetched since its candle may have been partial.
+        """
+        path = self._path(security_id, exchange_segment, interval)
+        length = self._length(path)
+
+        if length and self._read_meta(path).get('start_date', '9999-12-31') <= start_date:
+            last = int(self._read_column(path, 'timestamp', length)[-1])
+            fetch_from = datetime.fromtimestamp(last, IST).strftime('%Y-%m-%d')
+        else:
+            fetch_from = start_date
+        return fetch_from if fetch_from <= end_date else None
+
+    def merge(self, security_id, start_date, end_date, fetch_from, data, exchange_segment='NSE_EQ', interval='1d'):
+        """Replaces stored bars from `fetch_from` onwards with downloaded candles.
+
+        `data` is a dict of column lists in the Dhan candle format; rows are
+        sorted and de-duplicated by timestamp. Returns the number of bars written.
+        """
+        path = self._path(security_id, exchange_segment, interval)
+        meta = self._read_meta(path)
+        layout = self._layout(path, meta)
+        length = self._length(path)
+        timestamps = self._read_column(path, 'timestamp', length)
+
+        arrays = {column: cast_column(data[column], dtype) for column, dtype in layout.items()}
+        cutoff = day_start(fetch_from)
+        keep_rows = int(np.searchsorted(timestamps, cutoff, side='left'))
+        del timestamps  # Release the mapping before the column files are truncated
+        unique_timestamps, first_rows = np.unique(arrays['timestamp'], return_index=True)
+        new_rows = first_rows[unique_timestamps >= cutoff]
+        arrays = {column: values[new_rows] for column, values in arrays.items()}
+
+        covered = meta.get('start_date', '9999-12-31') <= start_date
+        self._write(path, arrays, keep_rows, layout)
+        self._write_meta(path, {'start_date': meta['start_date'] if covered else start_date,
+                                'end_date': max(end_date, meta.get('end_date', end_date)),
+                                'columns': {column: np.dtype(dtype).str for column, dtype in layout.items()}})
+        return len(new_rows)
+
+    def sync(self, security_id, start_date, end_date, download, exchange_segment='NSE_EQ', interval='1d'):
+        """Brings the stored bars up to `end_date` and returns the number of bars written.
+
+        `download(from_date, to_date)` must return a dict of column lists in the
+        Dhan candle format, or None on failure. Only the range reported by
+        `missing_from` is downloaded.
+        """
+        fetch_from = self.missing_from(security_id, start_date, end_date, exchange_segment, interval)
+        if fetch_from is None:
+            return 0
+
+        data = download(fetch_from, end_date)
+        if data is None:
+            return 0
+        return self.merge(security_id, start_date, end_date, fetch_from, data, exchange_segment, interval)
+
+    def load_arrays(self, security_id, start=None, end=None, exchange_segment='NSE_EQ', interval='1d'):
+        """Memory-mapped column arrays between the `start` and `end` dates (inclusive)."""
+        path = self._path(security_id, exchange_segment, interval)
+        layout = self._layout(path)
+        length = self._length(path)
+        timestamps = self._read_column(path, 'timestamp', length)
+
+        lo = np.searchsorted(timestamps, day_start(start), side='left') if start else 0
+        hi = np.searchsorted(timestamps, day_start(end) + 86400, side='left') if end else length
+        return {column: self._read_column(path, column, length, layout)[lo:hi] for column in layout}
+
+    def load_bars(self, security_id, start=None, end=None, exchange_segment='NSE_EQ', interval='1d'):
+        """Stored bars as a CompactBars over the memory-mapped columns, without copying."""
+        return CompactBars(self.load_arrays(security_id, start, end, exchange_segment, interval))
+
+    def load(self, security_id, start=None, end=None, exchange_segment='NSE_EQ', interval='1d'):
+        """Stored bars as a DataFrame indexed by IST timestamp, in the fetch_data layout."""
+        return self.load_bars(security_id, start, end, exchange_segment, interval).to_frame()
@@ -0,0 +1,74 @@
+import sys
+import time
+
+import pandas as pd
+import numpy as np
+
+from backtest_engine import run_backtest
+
+
+# Synthetic Data
+def make_bars(n_bars, seed=0):
+    """Random-walk 1-minute close prices for benchmarking."""
+    rng = np.random.default_rng(seed)
+    close = 1000 + np.cumsum(rng.normal(0, 1, n_bars))
+    index = pd.date_range('2020-01-01 09:15', periods=n_bars, freq='min')
+    return pd.DataFrame({'close': close}, index=index)
+
+
+def make_signals(data, short_window=5, long_window=20):
+    """Crossover signal diff, as produced by MovingAverageCrossoverStrategy.generate_signals."""
+    short_ma = data['close'].rolling(window=short_window, min_periods=1).mean()
+    long_ma = data['close'].rolling(window=long_window, min_periods=1).mean()
+    signal = np.where(short_ma.values > long_ma.values, 1.0, 0.0)
+    signal[:short_window] = 0.0
+    return pd.Series(signal, index=data.index).diff()
+
+
+# Reference Implementation
+def loop_backtest(data, signal, initial_capital=100000, share_quantity=10):
+    """The original per-bar backtest loop, without console output."""
+    capital = initial_capital
+    peak = capital
+    positions = []
+    profits = []
+    drawdowns = []
+
+    for i in range(1, len(data)):
+        if signal.iloc[i] == 1.0:
+            positions.append(data['close'].iloc[i].item())
+        elif signal.iloc[i] == -1.0 and positions:
+            profit = (data['close'].iloc[i].item() - positions.pop(0)) * share_quantity
+            capital += profit
+            profits.append(profit)
+            if capital > peak:
+                peak = capital
+            drawdowns.append((peak - capital) / peak * 100)
+
+    return capital, profits, drawdowns
+
+
+# Benchmark
+def main():
+    n_bars = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    data = make_bars(n_bars)
+    signal = make_signals(data)
+
+    start = time.perf_counter()
+    result = run_backtest(data['close'], signal)
+    vectorized_time = time.perf_counter() - start
+    print(f"Vectorized: {vectorized_time:.3f}s for {n_bars} bars ({n_bars / vectorized_time:,.0f} bars/sec)")
+
+    start = time.perf_counter()
+    capital, profits, drawdowns = loop_backtest(data, signal)
+    loop_time = time.perf_counter() - start
+    print(f"Per-bar loop: {loop_time:.3f}s for {n_bars} bars ({n_bars / loop_time:,.0f} bars/sec)")
+
+    assert result['ledger']['pnl'].tolist() == profits
+    assert result['trade_drawdowns'].tolist() == drawdowns
+    assert result['metrics']['final_capital'] == capital
+    print(f"Trades: {len(profits)}, results identical, speedup: {loop_time / vectorized_time:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
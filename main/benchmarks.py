@@ -0,0 +1,212 @@
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+import numpy as np
+
+from analytics import tear_sheet
+from backtest_engine import ledger_metrics, run_backtest
+from candle_decoder import candles_to_frame_fast, decode_candles
+from execution import NSE_INTRADAY, simulate
+from indicator_cache import IndicatorCache
+from without_pyqt5 import MovingAverageCrossoverStrategy, candles_to_frame
+
+DEFAULT_SIZES = [10_000, 1_000_000]
+
+
+# Synthetic Data
+def make_dhan_payload(n_bars, seed=0):
+    """Random-walk 1-minute candles in the Dhan historical JSON layout (lists per column)."""
+    rng = np.random.default_rng(seed)
+    close = 1000 + np.cumsum(rng.normal(0, 1, n_bars))
+    spread = np.abs(rng.normal(0, 0.5, n_bars))
+    return {
+        'open': (close + rng.normal(0, 0.2, n_bars)).tolist(),
+        'high': (close + spread).tolist(),
+        'low': (close - spread).tolist(),
+        'close': close.tolist(),
+        'volume': rng.integers(100, 100000, n_bars).tolist(),
+        'timestamp': (1577850300 + 60 * np.arange(n_bars)).tolist(),
+    }
+
+
+def make_ohlcv(n_bars, seed=0):
+    """Random-walk 1-minute OHLCV DataFrame, as returned by fetch_data."""
+    rng = np.random.default_rng(seed)
+    close = 1000 + np.cumsum(rng.normal(0, 1, n_bars))
+    spread = np.abs(rng.normal(0, 0.5, n_bars))
+    return pd.DataFrame({
+        'open': close + rng.normal(0, 0.2, n_bars),
+        'high': close + spread,
+        'low': close - spread,
+        'close': close,
+        'volume': rng.integers(100, 100000, n_bars),
+    }, index=pd.date_range('2020-01-01 09:15', periods=n_bars, freq='min', name='timestamp'))
+
+
+# Benchmark Cases
+# Each case takes the bar count, does its setup and returns the callable to time.
+def bench_frame_from_payload(n_bars):
+    payload = make_dhan_payload(n_bars)
+    return lambda: candles_to_frame(payload)
+
+
+def bench_frame_from_json(n_bars):
+    body = json.dumps(make_dhan_payload(n_bars)).encode()
+    return lambda: candles_to_frame(json.loads(body))
+
+
+def bench_frame_from_json_fast(n_bars):
+    body = json.dumps(make_dhan_payload(n_bars)).encode()
+    return lambda: candles_to_frame_fast(decode_candles(body))
+
+
+def bench_generate_signals(n_bars):
+    data = make_ohlcv(n_bars)
+    return lambda: MovingAverageCrossoverStrategy(data, 5, 20).generate_signals()
+
+
+def bench_generate_signals_cached(n_bars):
+    data = make_ohlcv(n_bars)
+    cache = IndicatorCache(data['close'])
+    cache.sma(5)
+    cache.sma(20)
+    return lambda: MovingAverageCrossoverStrategy(data, 5, 20, indicator_cache=cache).generate_signals()
+
+
+def bench_backtest(n_bars):
+    strategy = MovingAverageCrossoverStrategy(make_ohlcv(n_bars), 5, 20)
+    strategy.generate_signals()
+    return strategy.backtest
+
+
+def bench_path_backtest(n_bars):
+    strategy = MovingAverageCrossoverStrategy(make_ohlcv(n_bars), 5, 20, stop_loss=0.01, trailing_stop=0.02,
+                                              max_positions=3)
+    strategy.generate_signals()
+    strategy.backtest()  # Compile the kernel outside the timed runs
+    return strategy.backtest
+
+
+def bench_simulate(n_bars):
+    data = make_ohlcv(n_bars)
+    strategy = MovingAverageCrossoverStrategy(data, 5, 20)
+    strategy.generate_signals()
+    signal = strategy.signals['signal']
+    simulate(data, signal, fill='next_open', costs=NSE_INTRADAY)  # Compile the kernel outside the timed runs
+    return lambda: simulate(data, signal, fill='next_open', costs=NSE_INTRADAY, sizing='percent_equity',
+                            equity_fraction=0.1)
+
+
+def bench_metrics(n_bars):
+    strategy = MovingAverageCrossoverStrategy(make_ohlcv(n_bars), 5, 20)
+    strategy.generate_signals()
+    ledger = run_backtest(strategy.data['close'], strategy.signals['signal'])['ledger']
+    return lambda: ledger_metrics(ledger)
+
+
+def bench_tear_sheet(n_bars):
+    strategy = MovingAverageCrossoverStrategy(make_ohlcv(n_bars), 5, 20)
+    strategy.generate_signals()
+    result = run_backtest(strategy.data['close'], strategy.signals['signal'])
+    return lambda: tear_sheet(result['equity'], result['ledger'])
+
+
+BENCHMARKS = {
+    'frame_from_payload': bench_frame_from_payload,
+    'frame_from_json': bench_frame_from_json,
+    'frame_from_json_fast': bench_frame_from_json_fast,
+    'generate_signals': bench_generate_signals,
+    'generate_signals_cached': bench_generate_signals_cached,
+    'backtest': bench_backtest,
+    'path_backtest': bench_path_backtest,
+    'simulate': bench_simulate,
+    'metrics': bench_metrics,
+    'tear_sheet': bench_tear_sheet,
+}
+
+
+# Runner
+def measure(run, repeat):
+    """Best wall time over `repeat` runs, then peak traced memory of one more run."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return min(times), peak
+
+
+def run_benchmarks(names, sizes, repeat=3):
+    results = []
+    for name in names:
+        for n_bars in sizes:
+            seconds, peak = measure(BENCHMARKS[name](n_bars), repeat)
+            result = {
+                'benchmark': name,
+                'bars': n_bars,
+                'seconds': seconds,
+                'bars_per_sec': n_bars / seconds if seconds > 0 else float('inf'),
+                'peak_mb': peak / 2 ** 20,
+            }
+            results.append(result)
+            print(f"{name:<26} {n_bars:>10,} bars  {seconds * 1000:>10.2f} ms  "
+                  f"{result['bars_per_sec']:>14,.0f} bars/sec  {result['peak_mb']:>9.1f} MB peak")
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Prints slowdowns against a saved run and returns the regressions beyond `tolerance`."""
+    previous = {(r['benchmark'], r['bars']): r for r in baseline}
+    regressions = []
+    print("\n=== Comparison with baseline ===")
+    for result in results:
+        before = previous.get((result['benchmark'], result['bars']))
+        if before is None:
+            continue
+        ratio = result['seconds'] / before['seconds']
+        flag = "REGRESSION" if ratio > tolerance else ""
+        print(f"{result['benchmark']:<26} {result['bars']:>10,} bars  {ratio:>6.2f}x time  {flag}")
+        if flag:
+            regressions.append(result)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the backtesting hot paths.")
+    parser.add_argument('benchmarks', nargs='*', default=list(BENCHMARKS),
+                        help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES,
+                        help="bar counts, e.g. --sizes 10000 1000000 10000000")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--save', help="write results to this JSON file")
+    parser.add_argument('--compare', help="JSON file from an earlier --save to check for regressions")
+    parser.add_argument('--tolerance', type=float, default=1.2, help="allowed slowdown ratio (default 1.2)")
+    args = parser.parse_args()
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = run_benchmarks(args.benchmarks, args.sizes, args.repeat)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+import asyncio
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+import aiohttp
+
+from bar_store import BarStore
+from candle_decoder import decode_candles
+from dhan_client import API_KEY, BASE_URL, HISTORICAL_PATH, historical_payload
+
+# Dhan Data API rate limit (requests per second)
+DHAN_DATA_RATE = 5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+# Rate Limiting
+class TokenBucket:
+    """Async token bucket allowing `rate` requests per second with bursts up to `capacity`."""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def chunk_dates(start_date, end_date, chunk_days):
+    """Splits a date range into `chunk_days` requests; neighbouring chunks share their boundary day."""
+    start = datetime.strptime(start_date, '%Y-%m-%d')
+    end = datetime.strptime(end_date, '%Y-%m-%d')
+    chunks = []
+    while True:
+        chunk_end = min(start + timedelta(days=chunk_days), end)
+        chunks.append((start.strftime('%Y-%m-%d'), chunk_end.strftime('%Y-%m-%d')))
+        if chunk_end >= end:
+            return chunks
+        start = chunk_end
+
+
+# Async Fetching
+async def fetch_chunk(session, limiter, security_id, from_date, to_date, exchange_segment="NSE_EQ",
+                      retries=5, backoff=0.5):
+    """Fetches one candle range, retrying rate-limit and server errors with exponential backoff."""
+    url = f"{BASE_URL}{HISTORICAL_PATH}"
+    headers = {
+        'Content-Type': 'application/json',
+        'access-token': API_KEY
+    }
+    payload = historical_payload(security_id, from_date, to_date, exchange_segment)
+
+    for attempt in range(retries + 1):
+        await limiter.acquire()
+        try:
+            async with session.post(url, headers=headers, json=payload) as response:
+                if response.status == 200:
+                    data = decode_candles(await response.read())
+                    if 'timestamp' not in data:
+                        print(f"Unexpected response format for {security_id}: {data}")
+                        return None
+                    return data
+                if response.status not in RETRY_STATUSES:
+                    print(f"Error fetching {security_id}: {response.status} - {await response.text()}")
+                    return None
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Request for {security_id} failed: {e}")
+
+        if attempt < retries:
+            await asyncio.sleep(backoff * 2 ** attempt + random.uniform(0, backoff))
+
+    print(f"Giving up on {security_id} {from_date}..{to_date} after {retries + 1} attempts")
+    return None
+
+
+async def download_symbol(session, limiter, store, security_id, start_date, end_date,
+                          exchange_segment="NSE_EQ", interval='1d', chunk_days=365):
+    """Downloads the bars missing from the store for one symbol and writes them.
+
+    Returns the number of bars written, or None if any chunk failed (nothing is
+    written in that case, so the store never has gaps).
+    """
+    fetch_from = store.missing_from(security_id, start_date, end_date, exchange_segment, interval)
+    if fetch_from is None:
+        return 0
+
+    chunks = await asyncio.gather(*(
+        fetch_chunk(session, limiter, security_id, from_date, to_date, exchange_segment)
+        for from_date, to_date in chunk_dates(fetch_from, end_date, chunk_days)
+    ))
+    if any(chunk is None for chunk in chunks):
+        return None
+
+    data = {column: [value for chunk in chunks for value in chunk[column]] for column in chunks[0]}
+    return store.merge(security_id, start_date, end_date, fetch_from, data, exchange_segment, interval)
+
+
+async def download_all(security_ids, start_date, end_date, store=None, session=None, rate=DHAN_DATA_RATE,
+                       concurrency=20, exchange_segment="NSE_EQ", interval='1d', chunk_days=365):
+    """Fetches many symbols concurrently over one pooled session into the local store.
+
+    Requests across all symbols share a token bucket matched to the Dhan Data
+    API limit. Returns {security_id: bars written, or None on failure}.
+    """
+    store = store or BarStore()
+    limiter = TokenBucket(rate)
+    semaphore = asyncio.Semaphore(concurrency)
+    own_session = session is None
+    if own_session:
+        session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=concurrency),
+                                        timeout=aiohttp.ClientTimeout(total=60))
+
+    async def run(security_id):
+        async with semaphore:
+            written = await download_symbol(session, limiter, store, security_id, start_date, end_date,
+                                            exchange_segment, interval, chunk_days)
+            return security_id, written
+
+    results = {}
+    try:
+        for finished in asyncio.as_completed([run(security_id) for security_id in security_ids]):
+            security_id, written = await finished
+            results[security_id] = written
+            print(f"{security_id}: {'failed' if written is None else f'{written} bars'} "
+                  f"({len(results)}/{len(security_ids)})")
+    finally:
+        if own_session:
+            await session.close()
+    return results
+
+
+def bulk_download(security_ids, start_date, end_date, **kwargs):
+    """Blocking wrapper around download_all."""
+    return asyncio.run(download_all(list(security_ids), start_date, end_date, **kwargs))
+
+
+# Main function for console execution
+def main():
+    # Security IDs, one per line (e.g. the Nifty 500 constituents)
+    with open(sys.argv[1]) as f:
+        security_ids = [line.strip() for line in f if line.strip()]
+
+    start_date = (datetime.now() - timedelta(days=5 * 365)).strftime('%Y-%m-%d')
+    end_date = datetime.now().strftime('%Y-%m-%d')
+
+    results = bulk_download(security_ids, start_date, end_date)
+    failed = [security_id for security_id, written in results.items() if written is None]
+    print(f"\nDownloaded {len(results) - len(failed)} symbols, {len(failed)} failed: {failed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+import json
+
+import pandas as pd
+import numpy as np
+
+from bar_store import epoch_to_index
+
+# orjson is optional; without it the standard library parser is used
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    loads = json.loads
+
+# Candle columns and their array dtypes
+CANDLE_COLUMNS = {
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.int64,
+    'timestamp': np.int64,
+}
+
+
+def decode_candles(body):
+    """Decodes a Dhan candle response body into NumPy arrays, one per column.
+
+    orjson parses the body in C and each column list is released as soon as
+    its array is built. Responses that are not candles (e.g. errors) are
+    returned as decoded.
+    """
+    data = loads(body)
+    if not isinstance(data, dict) or 'timestamp' not in data:
+        return data
+    return {name: np.asarray(data.pop(name), dtype=dtype) for name, dtype in CANDLE_COLUMNS.items() if name in data}
+
+
+def candles_to_frame_fast(columns):
+    """OHLCV DataFrame on a naive IST index from decoded candle arrays (vectorized timestamps)."""
+    return pd.DataFrame({name: columns[name] for name in CANDLE_COLUMNS if name != 'timestamp'},
+                        index=epoch_to_index(columns['timestamp']))
@@ -0,0 +1,135 @@
+import numpy as np
+from PyQt5 import QtWidgets, QtCore, QtGui
+
+from lod import MinMaxPyramid
+
+# Series drawn in the price pane and their pen colors
+PRICE_SERIES = {
+    'close': QtGui.QColor(60, 60, 60),
+    'short_ma': QtGui.QColor(30, 120, 220),
+    'long_ma': QtGui.QColor(230, 140, 20),
+}
+EQUITY_COLOR = QtGui.QColor(40, 160, 80)
+BUY_COLOR = QtGui.QColor(0, 170, 0)
+SELL_COLOR = QtGui.QColor(210, 0, 0)
+
+
+# Strategy Chart
+class ChartPanel(QtWidgets.QWidget):
+    """Price, moving averages, trade markers and equity curve, drawn with QPainter.
+
+    Every series is drawn from a MinMaxPyramid decimated to the widget
+    width, and markers are thinned to one per pixel column, so repaints
+    stay fast for multi-million-bar series. Scroll to zoom around the
+    cursor, drag to pan and double-click to reset the view.
+    """
+    EQUITY_SHARE = 0.3  # Fraction of the height used by the equity pane
+    MARGIN = 6
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setMinimumHeight(250)
+        self.series = {}
+        self.equity = None
+        self.close = np.empty(0)
+        self.buys = np.empty(0, dtype=np.int64)
+        self.sells = np.empty(0, dtype=np.int64)
+        self.view = (0, 0)
+        self._drag_x = None
+
+    def set_data(self, close, short_ma, long_ma, buys, sells, equity):
+        """Replaces the plotted series; `buys` and `sells` are bar indices."""
+        self.close = np.asarray(close, dtype=np.float64).ravel()
+        self.series = {name: MinMaxPyramid(values)
+                       for name, values in zip(PRICE_SERIES, (close, short_ma, long_ma))}
+        self.equity = MinMaxPyramid(equity)
+        self.buys = np.asarray(buys, dtype=np.int64)
+        self.sells = np.asarray(sells, dtype=np.int64)
+        self.view = (0, len(self.close))
+        self.update()
+
+    # View Navigation
+    def _set_view(self, start, stop):
+        n_bars = len(self.close)
+        span = min(max(int(stop - start), 10), n_bars)
+        start = min(max(int(start), 0), n_bars - span)
+        self.view = (start, start + span)
+        self.update()
+
+    def wheelEvent(self, event):
+        if not len(self.close):
+            return
+        start, stop = self.view
+        anchor = start + (stop - start) * event.pos().x() / max(self.width(), 1)
+        scale = 0.8 if event.angleDelta().y() > 0 else 1.25
+        self._set_view(anchor - (anchor - start) * scale, anchor + (stop - anchor) * scale)
+
+    def mousePressEvent(self, event):
+        self._drag_x = event.pos().x()
+
+    def mouseMoveEvent(self, event):
+        if self._drag_x is None or not len(self.close):
+            return
+        start, stop = self.view
+        shift = (self._drag_x - event.pos().x()) * (stop - start) / max(self.width(), 1)
+        if abs(shift) >= 1:
+            self._drag_x = event.pos().x()
+            self._set_view(start + shift, stop + shift)
+
+    def mouseReleaseEvent(self, event):
+        self._drag_x = None
+
+    def mouseDoubleClickEvent(self, event):
+        self._set_view(0, len(self.close))
+
+    # Drawing
+    def _polyline(self, painter, positions, values, rect, low, high):
+        x = rect.left() + (positions - self.view[0]) * rect.width() / max(self.view[1] - self.view[0], 1)
+        y = rect.bottom() - (values - low) * rect.height() / ((high - low) or 1.0)
+        keep = ~np.isnan(y)
+        painter.drawPolyline(QtGui.QPolygonF([QtCore.QPointF(px, py) for px, py in zip(x[keep], y[keep])]))
+
+    def _markers(self, painter, bars, rect, low, high, color, up):
+        start, stop = self.view
+        bars = bars[(bars >= start) & (bars < stop)]
+        x = rect.left() + (bars - start) * rect.width() / max(stop - start, 1)
+        # One marker per pixel column is enough to show where trades cluster
+        _, first = np.unique(x.astype(np.int64), return_index=True)
+        painter.setPen(QtCore.Qt.NoPen)
+        painter.setBrush(color)
+        size = 5 if up else -5
+        for px, price in zip(x[first], self.close[bars[first]]):
+            py = rect.bottom() - (price - low) * rect.height() / ((high - low) or 1.0) + size * 2
+            painter.drawPolygon(QtGui.QPolygonF([QtCore.QPointF(px, py - size),
+                                                  QtCore.QPointF(px - abs(size), py + size),
+                                                  QtCore.QPointF(px + abs(size), py + size)]))
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), QtCore.Qt.white)
+        if not len(self.close):
+            return
+
+        columns = max(self.width() - 2 * self.MARGIN, 1)
+        full = QtCore.QRectF(self.rect()).adjusted(self.MARGIN, self.MARGIN, -self.MARGIN, -self.MARGIN)
+        split = full.height() * (1 - self.EQUITY_SHARE)
+        price_rect = QtCore.QRectF(full.left(), full.top(), full.width(), split - self.MARGIN)
+        equity_rect = QtCore.QRectF(full.left(), full.top() + split, full.width(), full.height() - split)
+        start, stop = self.view
+
+        # Price pane, scaled to everything visible in it
+        bounds = [pyramid.bounds(start, stop, columns) for pyramid in self.series.values()]
+        low, high = min(b[0] for b in bounds), max(b[1] for b in bounds)
+        for (name, pyramid), color in zip(self.series.items(), PRICE_SERIES.values()):
+            painter.setPen(QtGui.QPen(color, 1))
+            self._polyline(painter, *pyramid.decimate(start, stop, columns), price_rect, low, high)
+        self._markers(painter, self.buys, price_rect, low, high, BUY_COLOR, up=True)
+        self._markers(painter, self.sells, price_rect, low, high, SELL_COLOR, up=False)
+
+        # Equity pane
+        painter.setPen(QtGui.QPen(QtCore.Qt.lightGray, 1))
+        painter.drawLine(QtCore.QPointF(full.left(), full.top() + split - self.MARGIN / 2),
+                         QtCore.QPointF(full.right(), full.top() + split - self.MARGIN / 2))
+        low, high = self.equity.bounds(start, stop, columns)
+        painter.setPen(QtGui.QPen(EQUITY_COLOR, 1))
+        self._polyline(painter, *self.equity.decimate(start, stop, columns), equity_rect, low, high)
@@ -0,0 +1,251 @@
+import numpy as np
+
+from backtest_engine import TRADE_DTYPE, ledger_metrics
+from kernels import njit, HAVE_NUMBA
+
+# Ledger of simulated trades: TRADE_DTYPE plus the costs paid on both legs (pnl is net)
+EXECUTED_TRADE_DTYPE = np.dtype(TRADE_DTYPE.descr + [('costs', np.float64)])
+
+# Fill models: the bar and price at which an order placed on bar i executes
+FILL_MODELS = ('close', 'next_open', 'vwap', 'limit')
+
+# Position sizing: shares per entry
+SIZING_MODES = ('fixed', 'fixed_value', 'percent_equity')
+
+# NSE equity charges as fractions of turnover. Brokerage is min(pct * turnover,
+# max) per order; GST applies to brokerage and exchange/SEBI charges.
+NSE_DELIVERY = {
+    'brokerage_pct': 0.0,
+    'brokerage_max': 0.0,
+    'stt_buy': 0.001,
+    'stt_sell': 0.001,
+    'exchange': 0.0000297,
+    'sebi': 0.000001,
+    'stamp_buy': 0.00015,
+    'gst': 0.18,
+    'dp_sell': 13.5,  # Depository charge per sell, in rupees
+}
+NSE_INTRADAY = {
+    'brokerage_pct': 0.0003,
+    'brokerage_max': 20.0,
+    'stt_buy': 0.0,
+    'stt_sell': 0.00025,
+    'exchange': 0.0000297,
+    'sebi': 0.000001,
+    'stamp_buy': 0.00003,
+    'gst': 0.18,
+    'dp_sell': 0.0,
+}
+NO_COSTS = dict.fromkeys(NSE_DELIVERY, 0.0)
+
+_SIZING_CODES = {mode: code for code, mode in enumerate(SIZING_MODES)}
+
+
+def cost_params(costs):
+    """A charge table as the float array taken by `order_charges` and the kernels."""
+    return np.array([costs[name] for name in NSE_DELIVERY], dtype=np.float64)
+
+
+@njit(cache=True)
+def order_charges(turnover, buy, params):
+    """Charges, in rupees, on one order of `turnover` rupees."""
+    brokerage_pct, brokerage_max, stt_buy, stt_sell, exchange, sebi, stamp_buy, gst, dp_sell = params
+    brokerage = min(turnover * brokerage_pct, brokerage_max)
+    charges = turnover * (exchange + sebi)
+    fee = brokerage + charges + (brokerage + charges) * gst
+    if buy:
+        return fee + turnover * (stt_buy + stamp_buy)
+    return fee + turnover * stt_sell + dp_sell
+
+
+# Fill Resolution
+def resolve_fills(bars, order_bars, sides, fill='close', limit_offset=0.0, limit_bars=1, slippage_bps=0.0):
+    """Fill bar and price of every order, or -1 / NaN for orders that never fill.
+
+    'close' fills at the signal bar's close, 'next_open' at the next bar's
+    open and 'vwap' at the next bar's VWAP (a `vwap` column, else the typical
+    price). 'limit' rests at `limit_offset` below (buys) or above (sells) the
+    signal close for `limit_bars` bars and fills at the limit or at a better
+    open. Slippage moves every price against the order by `slippage_bps`.
+    """
+    if fill not in FILL_MODELS:
+        raise ValueError(f"Unknown fill model {fill!r}; expected one of {', '.join(FILL_MODELS)}")
+    close = np.asarray(bars['close'], dtype=np.float64).ravel()
+    n_bars = len(close)
+    fill_bars = np.full(len(order_bars), -1, dtype=np.int64)
+    prices = np.full(len(order_bars), np.nan)
+
+    if fill == 'close':
+        fill_bars[:] = order_bars
+        prices[:] = close[order_bars]
+    elif fill in ('next_open', 'vwap'):
+        filled = order_bars + 1 < n_bars
+        fill_bars[filled] = order_bars[filled] + 1
+        if fill == 'next_open':
+            source = np.asarray(bars['open'], dtype=np.float64).ravel()
+        elif 'vwap' in getattr(bars, 'columns', ()):
+            source = np.asarray(bars['vwap'], dtype=np.float64).ravel()
+        else:
+            source = (np.asarray(bars['high'], dtype=np.float64).ravel()
+                      + np.asarray(bars['low'], dtype=np.float64).ravel() + close) / 3
+        prices[filled] = source[fill_bars[filled]]
+    else:
+        open_ = np.asarray(bars['open'], dtype=np.float64).ravel()
+        high = np.asarray(bars['high'], dtype=np.float64).ravel()
+        low = np.asarray(bars['low'], dtype=np.float64).ravel()
+        limits = close[order_bars] * (1 - sides * limit_offset)
+        buy = sides > 0
+        # One vectorized pass per bar the order rests; orders fill on the first touch
+        for k in range(1, limit_bars + 1):
+            bar = order_bars + k
+            pending = (fill_bars < 0) & (bar < n_bars)
+            bar = np.where(pending, bar, 0)
+            touched = pending & np.where(buy, low[bar] <= limits, high[bar] >= limits)
+            fill_bars[touched] = bar[touched]
+            prices[touched] = np.where(buy, np.minimum(open_[bar], limits), np.maximum(open_[bar], limits))[touched]
+
+    prices *= 1 + sides * slippage_bps / 10000
+    return fill_bars, prices
+
+
+# Event Loop
+def _execute_fills(sides, prices, sizing, size, initial_capital, charges, quantities, fees, entries):
+    """Walks the fills in time order, sizing entries and closing lots FIFO.
+
+    Writes each fill's share quantity and charges (0 for sells with no open
+    lot) and, for closing fills, the fill index of the lot they close (else
+    -1). Returns the realized capital after the last fill.
+    """
+    lots = np.empty(len(sides), dtype=np.int64)
+    head = 0
+    tail = 0
+    capital = initial_capital
+
+    for k in range(len(sides)):
+        price = prices[k]
+        entries[k] = -1
+        if sides[k] > 0:
+            if sizing == 0:
+                quantity = size
+            elif sizing == 1:
+                quantity = np.floor(size / price)
+            else:
+                quantity = np.floor(size * capital / price)
+            if quantity <= 0:
+                quantities[k] = 0
+                fees[k] = 0.0
+                continue
+            lots[tail] = k
+            tail += 1
+        elif head < tail:
+            entries[k] = lots[head]
+            quantity = quantities[lots[head]]
+            head += 1
+        else:
+            quantities[k] = 0
+            fees[k] = 0.0
+            continue
+
+        fee = order_charges(quantity * price, sides[k] > 0, charges)
+        if sides[k] < 0:
+            capital += (price - prices[entries[k]]) * quantity - fee - fees[entries[k]]
+        quantities[k] = quantity
+        fees[k] = fee
+
+    return capital
+
+
+execute_fills_python = _execute_fills
+execute_fills_jit = njit(cache=True, nogil=True)(_execute_fills) if HAVE_NUMBA else _execute_fills
+
+
+# Simulation
+def simulate(bars, signal, fill='close', limit_offset=0.0, limit_bars=1, slippage_bps=0.0, costs=NSE_DELIVERY,
+             sizing='fixed', share_quantity=10, trade_value=None, equity_fraction=None, initial_capital=100000,
+             index=None, use_jit=True):
+    """Executes crossover signals as orders through a fill, cost and sizing model.
+
+    Every +1/-1 signal after bar 0 becomes a buy/sell order, filled by
+    `resolve_fills`. Entries are sized at `share_quantity` shares ('fixed'),
+    as many shares as `trade_value` buys ('fixed_value') or a share of
+    realized capital ('percent_equity', `equity_fraction` e.g. 0.1). Sells
+    close the oldest open lot, as in run_backtest; with `fill='close'`, no
+    costs and fixed sizing the results match it. Fill resolution, equity and
+    metrics are vectorized and only the fills (not the bars) go through the
+    event loop. Returns the run_backtest dict with an EXECUTED_TRADE_DTYPE
+    ledger, plus the `fills` of every order.
+    """
+    if sizing not in SIZING_MODES:
+        raise ValueError(f"Unknown sizing {sizing!r}; expected one of {', '.join(SIZING_MODES)}")
+    size = {'fixed': share_quantity, 'fixed_value': trade_value, 'percent_equity': equity_fraction}[sizing]
+    if size is None:
+        raise ValueError(f"Sizing {sizing!r} needs its size argument")
+
+    close = np.asarray(bars['close'], dtype=np.float64).ravel()
+    signal = np.asarray(signal, dtype=np.float64).ravel()
+    n_bars = len(close)
+    index = getattr(bars, 'index', None) if index is None else index
+
+    # Orders from signals; bar 0 is never traded, as in run_backtest
+    order_bars = np.flatnonzero((signal == 1.0) | (signal == -1.0))
+    order_bars = order_bars[order_bars > 0]
+    sides = signal[order_bars].astype(np.int64)
+    fill_bars, prices = resolve_fills(bars, order_bars, sides, fill, limit_offset, limit_bars, slippage_bps)
+
+    # Fills in execution order; stable, so same-bar fills keep their order sequence
+    filled = np.flatnonzero(fill_bars >= 0)
+    filled = filled[np.argsort(fill_bars[filled], kind='stable')]
+    fill_bars, prices, sides = fill_bars[filled], prices[filled], sides[filled]
+
+    quantities = np.empty(len(filled), dtype=np.float64)
+    fees = np.empty(len(filled), dtype=np.float64)
+    entries = np.empty(len(filled), dtype=np.int64)
+    kernel = execute_fills_jit if use_jit else execute_fills_python
+    kernel(sides, prices, _SIZING_CODES[sizing], float(size), float(initial_capital), cost_params(costs),
+           quantities, fees, entries)
+
+    # Trade ledger from the closing fills
+    closing = np.flatnonzero(entries >= 0)
+    opening = entries[closing]
+    ledger = np.empty(len(closing), dtype=EXECUTED_TRADE_DTYPE)
+    ledger['entry_index'] = fill_bars[opening]
+    ledger['exit_index'] = fill_bars[closing]
+    times = np.asarray(getattr(index, 'values', index)) if index is not None else None
+    if times is not None and np.issubdtype(times.dtype, np.datetime64):
+        ledger['entry_time'] = times[ledger['entry_index']]
+        ledger['exit_time'] = times[ledger['exit_index']]
+    else:
+        ledger['entry_time'] = np.datetime64('NaT')
+        ledger['exit_time'] = np.datetime64('NaT')
+    ledger['entry_price'] = prices[opening]
+    ledger['exit_price'] = prices[closing]
+    ledger['quantity'] = quantities[closing]
+    ledger['costs'] = fees[opening] + fees[closing]
+    ledger['pnl'] = (ledger['exit_price'] - ledger['entry_price']) * ledger['quantity'] - ledger['costs']
+    metrics, trade_drawdowns = ledger_metrics(ledger, initial_capital)
+
+    # Per-bar equity: cash plus shares held, marked to the close
+    signed = sides * quantities
+    cash = initial_capital - np.cumsum(np.bincount(fill_bars, signed * prices + fees, minlength=n_bars))
+    held = np.cumsum(np.bincount(fill_bars, signed, minlength=n_bars))
+    equity = cash + held * close
+    peaks = np.maximum.accumulate(equity) if n_bars else equity
+
+    fills = np.empty(len(filled), dtype=[('order_bar', np.int64), ('fill_bar', np.int64), ('side', np.int8),
+                                         ('price', np.float64), ('quantity', np.float64), ('costs', np.float64)])
+    fills['order_bar'] = order_bars[filled]
+    fills['fill_bar'] = fill_bars
+    fills['side'] = sides
+    fills['price'] = prices
+    fills['quantity'] = quantities
+    fills['costs'] = fees
+
+    return {
+        'ledger': ledger,
+        'fills': fills,
+        'buys': fill_bars[(sides > 0) & (quantities > 0)],
+        'trade_drawdowns': trade_drawdowns,
+        'equity': equity,
+        'drawdown': (peaks - equity) / peaks * 100,
+        'metrics': metrics,
+    }
@@ -0,0 +1,210 @@
+import json
+import re
+import sys
+import threading
+import zlib
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+from bar_store import IST, epoch_to_index
+from resample import INTERVAL_SECONDS, SESSION_CLOSE, SESSION_OPEN
+
+MARKET_DATA_ROUTE = re.compile(r'/marketdata/([^/]+)/historical$')
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.status_code = status_code
+        self._payload = payload
+        self.text = str(payload)
+        self.content = json.dumps(payload).encode()
+
+    def json(self):
+        return self._payload
+
+
+# Fake Dhan HTTP Session
+class FakeDhanSession:
+    """Stands in for `requests` against the Dhan historical candle endpoint.
+
+    Answers `post(url, headers=..., json=payload)` with deterministic daily
+    candles (one per weekday at 09:15 IST) for the requested date range, so
+    the same bar always has the same prices, and `get` on the
+    /marketdata/{symbol}/historical route used by dhan_back_test with
+    intraday prices around those candles. Every payload is recorded in
+    `self.requests`.
+    """
+
+    def __init__(self, seed=0):
+        self.seed = seed
+        self.requests = []
+
+    def candles(self, security_id, from_date, to_date):
+        start = datetime.strptime(from_date, '%Y-%m-%d')
+        days = (datetime.strptime(to_date, '%Y-%m-%d') - start).days + 1
+        dates = [start + timedelta(days=d) for d in range(max(days, 0))]
+        dates = [d for d in dates if d.weekday() < 5]
+
+        timestamps = np.array([int(d.replace(hour=9, minute=15, tzinfo=IST).timestamp()) for d in dates],
+                              dtype=np.int64)
+        ordinals = np.array([d.toordinal() for d in dates], dtype=np.int64)
+        phase = zlib.crc32(str(security_id).encode()) % 1000 + self.seed
+        close = 1000 + 100 * np.sin((ordinals + phase) / 15.0) + 20 * np.cos((ordinals + phase) / 3.0)
+        return {
+            'open': (close - 5).tolist(),
+            'high': (close + 10).tolist(),
+            'low': (close - 10).tolist(),
+            'close': close.tolist(),
+            'volume': ((ordinals * 7919 + phase) % 100000 + 1000).tolist(),
+            'timestamp': timestamps.tolist(),
+        }
+
+    def market_data(self, symbol, from_date, to_date, interval='15m'):
+        """Last traded prices every `interval` through each session (09:15-15:30 IST).
+
+        Each day's prices wiggle around that day's candle close; timestamps
+        are naive IST ISO strings, as the marketdata route returns them.
+        """
+        daily = self.candles(symbol, from_date, to_date)
+        seconds = INTERVAL_SECONDS[interval]
+        offsets = np.arange(0, max(SESSION_CLOSE - SESSION_OPEN, 1), seconds)
+        timestamps = (np.array(daily['timestamp'], dtype=np.int64)[:, np.newaxis] + offsets).ravel()
+        closes = np.repeat(daily['close'], len(offsets))
+        ltp = np.round(closes + 8 * np.sin(timestamps / 3600.0) + 3 * np.cos(timestamps / 900.0), 2)
+        times = epoch_to_index(timestamps).strftime('%Y-%m-%dT%H:%M:%S')
+        return {'data': [{'timestamp': t, 'ltp': p} for t, p in zip(times, ltp.tolist())]}
+
+    def post(self, url, headers=None, json=None, timeout=None):
+        self.requests.append(json)
+        if not url.endswith('/v2/charts/historical'):
+            return FakeResponse({'errorMessage': 'Not found'}, status_code=404)
+        return FakeResponse(self.candles(json['securityId'], json['fromDate'], json['toDate']))
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        params = params or {}
+        self.requests.append(params)
+        route = MARKET_DATA_ROUTE.search(urlsplit(url).path)
+        if route is None:
+            return FakeResponse({'errorMessage': 'Not found'}, status_code=404)
+        try:
+            return FakeResponse(self.market_data(route.group(1), params['from_date'], params['to_date'],
+                                                 params.get('interval', '15m')))
+        except (KeyError, ValueError) as e:
+            return FakeResponse({'errorMessage': f'Bad request: {e}'}, status_code=400)
+
+
+class FakeAsyncResponse:
+    def __init__(self, response):
+        self.status = response.status_code
+        self._response = response
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def json(self):
+        return self._response.json()
+
+    async def read(self):
+        return self._response.content
+
+    async def text(self):
+        return self._response.text
+
+
+# Fake aiohttp Session
+class FakeAsyncDhanSession(FakeDhanSession):
+    """FakeDhanSession with the aiohttp `async with session.post(...)` interface.
+
+    `fail_first` makes the first N requests answer 429 to exercise retries.
+    """
+
+    def __init__(self, seed=0, fail_first=0):
+        super().__init__(seed)
+        self.fail_first = fail_first
+
+    def post(self, url, headers=None, json=None):
+        if self.fail_first > 0:
+            self.fail_first -= 1
+            self.requests.append(json)
+            return FakeAsyncResponse(FakeResponse({'errorMessage': 'Too many requests'}, status_code=429))
+        return FakeAsyncResponse(super().post(url, headers=headers, json=json))
+
+    async def close(self):
+        pass
+
+
+# Mock Dhan Server
+class MockDhanServer:
+    """Local HTTP server answering the Dhan historical and marketdata routes with FakeDhanSession data.
+
+    Used as a context manager, it serves on a free port in a background
+    thread; point a DhanClient (or DHAN_BASE_URL) at `url` to run fetches,
+    backtests and the bulk downloader offline over real HTTP.
+    """
+
+    def __init__(self, seed=0, host='127.0.0.1', port=0):
+        self.fake = FakeDhanSession(seed)
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        self.thread = None
+
+    @property
+    def requests(self):
+        return self.fake.requests
+
+    def _handler(self):
+        fake = self.fake
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                self._reply(fake.post(self.path, json=json.loads(body or b'{}')))
+
+            def do_GET(self):
+                parts = urlsplit(self.path)
+                self._reply(fake.get(parts.path, params=dict(parse_qsl(parts.query))))
+
+            def _reply(self, response):
+                payload = response.content
+                self.send_response(response.status_code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+        return False
+
+
+if __name__ == "__main__":
+    # Serve until interrupted, e.g. `python fake_dhan.py 8765` then DHAN_BASE_URL=http://127.0.0.1:8765
+    server = MockDhanServer(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8765)
+    print(f"Mock Dhan server on {server.url}")
+    try:
+        server.server.serve_forever()
+    except KeyboardInterrupt:
+        server.server.server_close()
@@ -0,0 +1,80 @@
+from collections import OrderedDict
+
+import numpy as np
+
+# Prices times this are whole numbers for rupee quotes (two decimals, NSE 0.05 ticks)
+TICK_SCALE = 100
+
+
+# Rolling-Mean Cache
+class IndicatorCache:
+    """Per-dataset SMA cache built on a single prefix sum of the close prices.
+
+    Any window's simple moving average is derived in O(n) from the prefix
+    sum, matching `close.rolling(window, min_periods=1).mean()`. When every
+    price is a whole number of ticks (`close * tick_scale` integral) the
+    prefix sum is kept in int64 ticks, so each average is the exactly
+    rounded mean and equal averages compare equal: MA ties are real ties,
+    not rounding noise. Other prices fall back to a float prefix sum. A 2-D
+    (time x symbol) array is handled column-wise. Results are memoized by
+    window with least-recently-used eviction.
+    """
+
+    def __init__(self, close, maxsize=64, tick_scale=TICK_SCALE):
+        close = np.asarray(close, dtype=np.float64)
+        if close.ndim == 2 and close.shape[1] == 1:
+            close = close.ravel()
+        self.length = close.shape[0]
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+
+        valid = ~np.isnan(close)
+        zeros = np.zeros((1,) + close.shape[1:])
+        self._counts = np.concatenate((zeros.astype(np.int64), np.cumsum(valid, axis=0)))
+
+        # Integer ticks sum exactly while the total stays below 2**53 (exact as float64)
+        ticks = np.where(valid, close, 0.0) * (tick_scale or 0)
+        whole = np.rint(ticks)
+        if tick_scale and np.all(np.abs(ticks - whole) < 1e-6) and np.abs(whole).sum() < 2 ** 53:
+            self._scale = tick_scale
+            self._offset = 0.0
+            self._sums = np.concatenate((zeros.astype(np.int64), np.cumsum(whole.astype(np.int64), axis=0)))
+            return
+
+        # Prices are offset by the first close so the prefix sum stays small
+        # and subtracting two sums loses less precision on long histories
+        self._scale = None
+        first = np.take_along_axis(close, valid.argmax(axis=0)[np.newaxis], axis=0)[0]
+        self._offset = np.where(valid.any(axis=0), first, 0.0)
+        self._sums = np.concatenate((zeros, np.cumsum(np.where(valid, close - self._offset, 0.0), axis=0)))
+
+    def sma(self, window):
+        """Simple moving average over `window` bars (min_periods=1)."""
+        if window in self._cache:
+            self.hits += 1
+            self._cache.move_to_end(window)
+            return self._cache[window]
+
+        self.misses += 1
+        end = np.arange(1, self.length + 1)
+        start = np.maximum(end - window, 0)
+        counts = self._counts[end] - self._counts[start]
+        sums = self._sums[end] - self._sums[start]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            if self._scale is not None:
+                # One division of exact integers: the correctly rounded mean
+                values = sums / (counts * self._scale)
+            else:
+                values = sums / counts + self._offset
+        values[counts == 0] = np.nan
+        values.flags.writeable = False
+
+        self._cache[window] = values
+        if len(self._cache) > self.maxsize:
+            self._cache.popitem(last=False)
+        return values
+
+    def clear(self):
+        self._cache.clear()
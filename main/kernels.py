@@ -0,0 +1,136 @@
+import numpy as np
+
+from backtest_engine import build_ledger, ledger_metrics
+
+# Numba is optional; without it the kernels run as plain Python
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda function: function
+
+# Exit reasons recorded per trade
+EXIT_SIGNAL = 0
+EXIT_STOP_LOSS = 1
+EXIT_TRAILING_STOP = 2
+
+
+# Path-Dependent Backtest Kernel
+def _path_backtest(close, signal, initial_capital, share_quantity, stop_loss, trailing_stop, max_positions,
+                   buys, entries, exits, reasons, equity):
+    """Event loop over plain arrays; returns the number of trades and of buys written.
+
+    Open positions are kept oldest first. On every bar, stops are checked
+    before the bar's signal: a buy opens a position while fewer than
+    `max_positions` are open and a sell closes the oldest. A stop of 0
+    disables it. Fills are at the bar's close.
+    """
+    n_bars = close.shape[0]
+    open_entries = np.empty(max_positions, dtype=np.int64)
+    open_peaks = np.empty(max_positions, dtype=np.float64)
+    n_open = 0
+    n_trades = 0
+    n_buys = 0
+    capital = initial_capital
+
+    for i in range(n_bars):
+        price = close[i]
+
+        if i > 0:
+            # Stops and trailing exits, keeping the remaining positions in order
+            kept = 0
+            for k in range(n_open):
+                entry = open_entries[k]
+                peak = max(open_peaks[k], price)
+                reason = -1
+                if stop_loss > 0 and price <= close[entry] * (1 - stop_loss):
+                    reason = EXIT_STOP_LOSS
+                elif trailing_stop > 0 and price <= peak * (1 - trailing_stop):
+                    reason = EXIT_TRAILING_STOP
+                if reason >= 0:
+                    entries[n_trades] = entry
+                    exits[n_trades] = i
+                    reasons[n_trades] = reason
+                    capital += (price - close[entry]) * share_quantity
+                    n_trades += 1
+                else:
+                    open_entries[kept] = entry
+                    open_peaks[kept] = peak
+                    kept += 1
+            n_open = kept
+
+            # Crossover signal
+            if signal[i] == 1.0 and n_open < max_positions:
+                open_entries[n_open] = i
+                open_peaks[n_open] = price
+                n_open += 1
+                buys[n_buys] = i
+                n_buys += 1
+            elif signal[i] == -1.0 and n_open > 0:
+                entry = open_entries[0]
+                entries[n_trades] = entry
+                exits[n_trades] = i
+                reasons[n_trades] = EXIT_SIGNAL
+                capital += (price - close[entry]) * share_quantity
+                n_trades += 1
+                for k in range(1, n_open):
+                    open_entries[k - 1] = open_entries[k]
+                    open_peaks[k - 1] = open_peaks[k]
+                n_open -= 1
+
+        # Mark open positions to the close
+        marked = capital
+        for k in range(n_open):
+            marked += (price - close[open_entries[k]]) * share_quantity
+        equity[i] = marked
+
+    return n_trades, n_buys
+
+
+path_backtest_python = _path_backtest
+path_backtest_jit = njit(cache=True, nogil=True)(_path_backtest) if HAVE_NUMBA else _path_backtest
+
+
+def run_path_backtest(close, signal, initial_capital=100000, share_quantity=10, stop_loss=0.0,
+                      trailing_stop=0.0, max_positions=None, index=None, use_jit=True):
+    """Backtests crossover signals with stops and a position limit.
+
+    `stop_loss` and `trailing_stop` are fractions of the entry price and of the
+    highest close since entry. `max_positions=None` allows as many open
+    positions as the signals produce, which reproduces backtest_engine's
+    run_backtest. Returns the same dict as run_backtest plus `exit_reasons`.
+    """
+    close = np.ascontiguousarray(np.asarray(close, dtype=np.float64).ravel())
+    signal = np.ascontiguousarray(np.asarray(signal, dtype=np.float64).ravel())
+    n_bars = len(close)
+    max_positions = n_bars if max_positions is None else max_positions
+
+    buys = np.empty(n_bars, dtype=np.int64)
+    entries = np.empty(n_bars, dtype=np.int64)
+    exits = np.empty(n_bars, dtype=np.int64)
+    reasons = np.empty(n_bars, dtype=np.int8)
+    equity = np.empty(n_bars, dtype=np.float64)
+
+    kernel = path_backtest_jit if use_jit else path_backtest_python
+    n_trades, n_buys = kernel(close, signal, float(initial_capital), float(share_quantity), float(stop_loss or 0.0),
+                              float(trailing_stop or 0.0), max(int(max_positions), 1),
+                              buys, entries, exits, reasons, equity)
+
+    ledger = build_ledger(close, entries[:n_trades], exits[:n_trades], share_quantity, index)
+    metrics, trade_drawdowns = ledger_metrics(ledger, initial_capital)
+    peaks = np.maximum.accumulate(equity) if n_bars else equity
+
+    return {
+        'ledger': ledger,
+        'buys': buys[:n_buys],
+        'exit_reasons': reasons[:n_trades],
+        'trade_drawdowns': trade_drawdowns,
+        'equity': equity,
+        'drawdown': (peaks - equity) / peaks * 100,
+        'metrics': metrics,
+    }
@@ -0,0 +1,52 @@
+import numpy as np
+
+
+# Level-of-Detail Decimation
+class MinMaxPyramid:
+    """Min/max envelope of a series at block sizes 1, 8, 64, ...
+
+    `decimate` returns at most two points (min then max) per pixel column
+    for any visible bar range, so drawing cost depends on the widget width
+    and not on the series length. Coarse levels are built once; a query
+    reads only the level whose block size is just below the bars per
+    column, so it touches O(columns * FACTOR) values. NaNs are ignored.
+    """
+    FACTOR = 8
+    MIN_LEVEL_SIZE = 1024
+
+    def __init__(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        self.values = values
+        self.levels = [(values, values)]
+        mins, maxs = values, values
+        while len(mins) > self.MIN_LEVEL_SIZE:
+            pad = -len(mins) % self.FACTOR
+            mins = np.fmin.reduce(np.append(mins, np.full(pad, np.nan)).reshape(-1, self.FACTOR), axis=1)
+            maxs = np.fmax.reduce(np.append(maxs, np.full(pad, np.nan)).reshape(-1, self.FACTOR), axis=1)
+            self.levels.append((mins, maxs))
+
+    def __len__(self):
+        return len(self.values)
+
+    def decimate(self, start, stop, columns):
+        """(bar positions, values) covering bars [start, stop) in about `columns` pixel columns."""
+        start, stop = max(int(start), 0), min(int(stop), len(self.values))
+        if stop - start <= 2 * columns:
+            return np.arange(start, stop), self.values[start:stop]
+
+        level = min(int(np.log((stop - start) / columns) / np.log(self.FACTOR)), len(self.levels) - 1)
+        block = self.FACTOR ** level
+        mins, maxs = self.levels[level]
+        first, last = start // block, -(-stop // block)
+        edges = np.unique(np.linspace(first, last, columns + 1).astype(np.int64)[:-1])
+        column_mins = np.fmin.reduceat(mins[first:last], edges - first)
+        column_maxs = np.fmax.reduceat(maxs[first:last], edges - first)
+        positions = np.maximum(edges * block, start)
+        return np.repeat(positions, 2), np.column_stack((column_mins, column_maxs)).ravel()
+
+    def bounds(self, start, stop, columns):
+        """(min, max) of the decimated range, for scaling an axis."""
+        _, values = self.decimate(start, stop, columns)
+        if not len(values) or np.isnan(values).all():
+            return 0.0, 1.0
+        return float(np.nanmin(values)), float(np.nanmax(values))
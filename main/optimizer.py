@@ -0,0 +1,131 @@
+import itertools
+import os
+import random
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from multiprocessing import Pool, shared_memory, util
+
+import pandas as pd
+import numpy as np
+
+from backtest_engine import crossover_signals, run_backtest
+from indicator_cache import IndicatorCache
+
+METRIC_COLUMNS = ['total_trades', 'winning_trades', 'losing_trades', 'win_rate', 'total_profit',
+                  'max_drawdown', 'avg_profit', 'avg_loss', 'final_capital']
+
+# Worker state, set once per process by init_worker
+_shm = None
+_close = None
+_indicators = None
+_settings = None
+
+
+@contextmanager
+def shared_prices(close):
+    """Copies the close prices into a shared memory block and yields its name."""
+    shm = shared_memory.SharedMemory(create=True, size=max(close.nbytes, 1))
+    try:
+        np.ndarray(close.shape, dtype=np.float64, buffer=shm.buf)[:] = close
+        yield shm.name
+    finally:
+        shm.close()
+        shm.unlink()
+
+
+def init_worker(shm_name, length, initial_capital, share_quantity):
+    """Attach the worker to the shared close-price array and give it an SMA cache."""
+    global _shm, _close, _indicators, _settings
+    _shm = shared_memory.SharedMemory(name=shm_name)
+    _close = np.ndarray((length,), dtype=np.float64, buffer=_shm.buf)
+    _indicators = IndicatorCache(_close)
+    _settings = (initial_capital, share_quantity)
+    # Runs when the worker exits normally (the pool is closed and joined, not terminated)
+    util.Finalize(None, detach_worker, exitpriority=10)
+
+
+def detach_worker():
+    """Drops the worker's views of the shared prices and closes its handle; only the parent unlinks."""
+    global _shm, _close, _indicators
+    _close = _indicators = None
+    if _shm is not None:
+        _shm.close()
+        _shm = None
+
+
+def backtest_windows(short_window, long_window, start=0, end=None):
+    """Metrics for one window pair over bars [start, end) of the worker's shared prices.
+
+    SMAs come from the worker's cache over the full history, so a slice's
+    first bars use the (earlier) bars before it rather than a shorter window.
+    """
+    short_ma = _indicators.sma(short_window)[start:end]
+    long_ma = _indicators.sma(long_window)[start:end]
+    signal = crossover_signals(short_ma, long_ma, short_window)
+    return run_backtest(_close[start:end], signal, *_settings)['metrics']
+
+
+def _evaluate(params):
+    """Backtests one (short_window, long_window) pair against the shared prices."""
+    short_window, long_window = params
+    return {'short_window': short_window, 'long_window': long_window,
+            **backtest_windows(short_window, long_window)}
+
+
+# Parameter Sweeps
+def run_sweep(data, params, rank_by='total_profit', ascending=False,
+              initial_capital=100000, share_quantity=10, processes=None):
+    """Backtests every (short_window, long_window) pair across a process pool.
+
+    The close prices are copied once into shared memory; workers read them in
+    place instead of receiving a pickled DataFrame per task. Returns a results
+    table ranked by `rank_by`.
+    """
+    params = [(int(s), int(l)) for s, l in params if s < l]
+    close = np.asarray(data['close'], dtype=np.float64).ravel()
+    processes = processes or os.cpu_count()
+
+    with shared_prices(close) as shm_name:
+        chunksize = max(1, len(params) // (processes * 8))
+        with Pool(processes, initializer=init_worker,
+                  initargs=(shm_name, len(close), initial_capital, share_quantity)) as pool:
+            rows = pool.map(_evaluate, params, chunksize=chunksize)
+            pool.close()  # Let workers exit and detach before the block is unlinked
+            pool.join()
+
+    results = pd.DataFrame(rows, columns=['short_window', 'long_window'] + METRIC_COLUMNS)
+    return results.sort_values(rank_by, ascending=ascending, kind='stable').reset_index(drop=True)
+
+
+def grid_search(data, short_windows, long_windows, **kwargs):
+    """Backtests every combination of the given short and long windows."""
+    return run_sweep(data, itertools.product(short_windows, long_windows), **kwargs)
+
+
+def random_search(data, short_windows, long_windows, n_iter=100, seed=None, **kwargs):
+    """Backtests `n_iter` distinct combinations sampled from the given windows."""
+    grid = [(s, l) for s, l in itertools.product(short_windows, long_windows) if s < l]
+    params = random.Random(seed).sample(grid, min(n_iter, len(grid)))
+    return run_sweep(data, params, **kwargs)
+
+
+# Main function for console execution
+def main():
+    from without_pyqt5 import fetch_data
+
+    security_id = '500325'
+    start_date = (datetime.now() - timedelta(days=365)).strftime('%Y-%m-%d')
+    end_date = datetime.now().strftime('%Y-%m-%d')
+
+    data = fetch_data(security_id, start_date, end_date)
+
+    if data.empty:
+        print("No data available for the selected parameters.")
+        return
+
+    results = grid_search(data, range(2, 31), range(10, 201, 5))
+    print(results.head(20).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+
+from bar_store import IST, index_to_epoch
+from execution import NSE_INTRADAY, cost_params, order_charges
+from streaming_strategy import StreamingCrossoverStrategy
+
+BAR_FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+
+# Market Feeds
+class ReplayFeed:
+    """Bars from a JSON-lines replay file, standing in for the Dhan live feed.
+
+    Each line holds one bar with an epoch-seconds `timestamp` and OHLCV
+    fields. `speed` replays that many bar-seconds per wall second (e.g. 60
+    plays 1-minute bars once a second); 0 replays as fast as possible. Any
+    async iterable of bar dicts can be used as a feed in its place.
+    """
+
+    def __init__(self, path, speed=0.0):
+        self.path = path
+        self.speed = speed
+
+    @staticmethod
+    def record(data, path):
+        """Writes an OHLCV DataFrame or CompactBars out as a replay file."""
+        timestamps = index_to_epoch(data.index)
+        columns = [np.asarray(data[name]).tolist() for name in BAR_FIELDS[1:]]
+        with open(path, 'w') as f:
+            for values in zip(timestamps.tolist(), *columns):
+                f.write(json.dumps(dict(zip(BAR_FIELDS, values))) + '\n')
+
+    async def __aiter__(self):
+        previous = None
+        with open(self.path) as f:
+            for line in f:
+                bar = json.loads(line)
+                if self.speed and previous is not None:
+                    await asyncio.sleep((bar['timestamp'] - previous) / self.speed)
+                previous = bar['timestamp']
+                yield bar
+
+
+# Simulated Broker
+class SimulatedBroker:
+    """Fills market orders at the given price plus slippage, charging NSE costs.
+
+    Buys open a lot and sells close the oldest one, as in the backtests;
+    sells with no open lot are rejected. Keeps cash, open lots and every
+    closed trade.
+    """
+
+    def __init__(self, initial_capital=100000, costs=NSE_INTRADAY, slippage_bps=0.0):
+        self.initial_capital = initial_capital
+        self.cash = float(initial_capital)
+        self.charges = cost_params(costs)
+        order_charges(0.0, True, self.charges)  # Compile before the first live order
+        self.slippage_bps = slippage_bps
+        self.lots = []  # [timestamp, price, quantity, charges], oldest first
+        self.trades = []
+        self.orders = 0
+
+    def submit(self, side, quantity, price, timestamp):
+        """Executes a buy (+1) or sell (-1) order; returns the fill dict, or None if rejected."""
+        self.orders += 1
+        if side < 0:
+            if not self.lots:
+                return None
+            quantity = self.lots[0][2]
+        price = price * (1 + side * self.slippage_bps / 10000)
+        fee = order_charges(quantity * price, side > 0, self.charges)
+        self.cash -= side * quantity * price + fee
+
+        if side > 0:
+            self.lots.append([timestamp, price, quantity, fee])
+        else:
+            entry_time, entry_price, _, entry_fee = self.lots.pop(0)
+            self.trades.append({
+                'entry_time': entry_time,
+                'exit_time': timestamp,
+                'entry_price': entry_price,
+                'exit_price': price,
+                'quantity': quantity,
+                'pnl': (price - entry_price) * quantity - fee - entry_fee,
+            })
+        return {'timestamp': timestamp, 'side': side, 'price': price, 'quantity': quantity, 'charges': fee}
+
+    def equity(self, price):
+        """Cash plus open lots marked to `price`."""
+        return self.cash + sum(lot[2] for lot in self.lots) * price
+
+
+# Latency Recording
+class LatencyHistogram:
+    """Power-of-two nanosecond buckets: bucket k counts latencies in [2**(k-1), 2**k)."""
+
+    def __init__(self, budget_ns=1_000_000):
+        self.budget_ns = budget_ns
+        self.counts = [0] * 64
+        self.count = 0
+        self.max = 0
+        self.over_budget = 0
+
+    def record(self, nanoseconds):
+        self.counts[nanoseconds.bit_length()] += 1
+        self.count += 1
+        if nanoseconds > self.max:
+            self.max = nanoseconds
+        if nanoseconds > self.budget_ns:
+            self.over_budget += 1
+
+    def percentile(self, q):
+        """Upper bound, in nanoseconds, of the q-th percentile's bucket."""
+        target = q / 100 * self.count
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if count and seen >= target:
+                return min(2 ** bucket, self.max)
+        return 0
+
+    def report(self):
+        lines = [f"Bars: {self.count}, p50 <= {self.percentile(50) / 1000:.1f} us, "
+                 f"p99 <= {self.percentile(99) / 1000:.1f} us, max {self.max / 1000:.1f} us, "
+                 f"over {self.budget_ns / 1e6:g} ms budget: {self.over_budget}"]
+        for bucket, count in enumerate(self.counts):
+            if count:
+                lines.append(f"  < {2 ** bucket / 1000:>10.1f} us  {count:>9}  {'#' * max(1, 50 * count // self.count)}")
+        return "\n".join(lines)
+
+
+# Paper Trading Loop
+class PaperTrader:
+    """Drives a StreamingCrossoverStrategy from a feed and trades through a broker.
+
+    For every bar, the time from receiving the bar to the order being
+    submitted (the decision latency, feed waiting excluded) is recorded in
+    `latency`.
+    """
+
+    def __init__(self, feed, strategy, broker, share_quantity=10, budget_ms=1.0, verbose=1):
+        self.feed = feed
+        self.strategy = strategy
+        self.broker = broker
+        self.share_quantity = share_quantity
+        self.latency = LatencyHistogram(int(budget_ms * 1_000_000))
+        self.verbose = verbose
+        self.last_price = None
+
+    def on_bar(self, bar):
+        """Updates the strategy with one bar and submits its order; returns the fill, if any."""
+        signal = self.strategy.update(bar['close'])
+        if signal == 1.0 or signal == -1.0:
+            return self.broker.submit(int(signal), self.share_quantity, bar['close'], bar['timestamp'])
+        return None
+
+    async def run(self):
+        async for bar in self.feed:
+            start = time.perf_counter_ns()
+            fill = self.on_bar(bar)
+            self.latency.record(time.perf_counter_ns() - start)
+
+            self.last_price = bar['close']
+            if fill and self.verbose:
+                action = "Bought" if fill['side'] > 0 else "Sold"
+                print(f"{action} {fill['quantity']} at {fill['price']:.2f} on "
+                      f"{datetime.fromtimestamp(fill['timestamp'], IST):%Y-%m-%d %H:%M}")
+        return self.summary()
+
+    def summary(self):
+        profits = [trade['pnl'] for trade in self.broker.trades]
+        equity = self.broker.equity(self.last_price) if self.last_price is not None else self.broker.cash
+        return {
+            'orders': self.broker.orders,
+            'total_trades': len(profits),
+            'total_profit': sum(profits),
+            'open_lots': len(self.broker.lots),
+            'equity': equity,
+            'latency_p99_us': self.latency.percentile(99) / 1000,
+            'over_budget': self.latency.over_budget,
+        }
+
+
+# Main function for console execution
+def main():
+    # Replay file (see ReplayFeed.record) and optional replay speed
+    path = sys.argv[1]
+    speed = float(sys.argv[2]) if len(sys.argv) > 2 else 0.0
+
+    trader = PaperTrader(ReplayFeed(path, speed), StreamingCrossoverStrategy(10, 50), SimulatedBroker())
+    summary = asyncio.run(trader.run())
+
+    print("\n=== Paper Trading Results ===")
+    print(f"Orders: {summary['orders']}, Closed Trades: {summary['total_trades']}, "
+          f"Open Lots: {summary['open_lots']}")
+    print(f"Total Profit: {summary['total_profit']:.2f}")
+    print(f"Equity: {summary['equity']:.2f}")
+    print("\n=== Decision Latency ===")
+    print(trader.latency.report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import pandas as pd
+import numpy as np
+
+from backtest_engine import crossover_signals
+from indicator_cache import IndicatorCache
+
+
+def align_closes(frames):
+    """Aligns {symbol: OHLCV DataFrame} into one (time x symbol) close frame.
+
+    Prices are forward-filled after a symbol's first bar; bars before it stay NaN.
+    """
+    closes = pd.concat({symbol: frame['close'] for symbol, frame in frames.items()}, axis=1)
+    return closes.sort_index().ffill()
+
+
+# Portfolio Moving Average Crossover Strategy
+class PortfolioCrossoverStrategy:
+    """MovingAverageCrossoverStrategy applied to a whole universe in one pass.
+
+    Signals for every symbol come from a single (time x symbol) price matrix.
+    Capital is shared: each bar the portfolio is split equally across the
+    symbols holding a long position (entered and exited at the bar's close,
+    as in the single-symbol backtest) and sits in cash when none are.
+    """
+
+    def __init__(self, closes, short_window=10, long_window=50, initial_capital=100000):
+        self.closes = closes
+        self.symbols = list(closes.columns)
+        self.short_window = short_window
+        self.long_window = long_window
+        self.initial_capital = initial_capital
+        self.prices = closes.to_numpy(dtype=np.float64)
+        self.indicators = IndicatorCache(self.prices)
+
+    def generate_signals(self):
+        """Buy (+1) / sell (-1) crossover signals for every symbol."""
+        self.short_ma = self.indicators.sma(self.short_window)
+        self.long_ma = self.indicators.sma(self.long_window)
+        self.signals = crossover_signals(self.short_ma, self.long_ma, self.short_window)
+        return pd.DataFrame(self.signals, index=self.closes.index, columns=self.symbols)
+
+    def _positions(self):
+        """Long/flat position mask and matched (bar, symbol) entries and exits."""
+        step = np.zeros(self.signals.shape, dtype=np.int64)
+        step[1:][self.signals[1:] == 1.0] = 1
+        step[1:][self.signals[1:] == -1.0] = -1
+
+        # Open count per symbol, with sells ignored while flat (see backtest_engine.pair_trades)
+        running = np.cumsum(step, axis=0)
+        open_count = running - np.minimum(np.minimum.accumulate(running, axis=0), 0)
+        open_before = np.concatenate((np.zeros((1, step.shape[1]), dtype=np.int64), open_count[:-1]))
+        is_exit = (step == -1) & (open_before > 0)
+
+        # Pair the k-th exit of each symbol with its k-th buy; nonzero on the
+        # transpose orders both lists by symbol, then time
+        exit_symbols, exit_bars = np.nonzero(is_exit.T)
+        buy_symbols, buy_bars = np.nonzero((step == 1).T)
+        exits_per_symbol = np.bincount(exit_symbols, minlength=step.shape[1])
+        buy_rank = np.cumsum((step == 1), axis=0)[buy_bars, buy_symbols]
+        matched = buy_rank <= exits_per_symbol[buy_symbols]
+        return open_count > 0, buy_bars[matched], exit_bars, exit_symbols
+
+    def backtest(self):
+        """Backtests the universe and returns the final portfolio value.
+
+        Sets `self.equity` (per bar), `self.metrics` (aggregate) and
+        `self.symbol_metrics` (one row per symbol).
+        """
+        held, entry_bars, exit_bars, trade_symbols = self._positions()
+        n_symbols = len(self.symbols)
+
+        # Equal weights across held symbols, applied to the next bar's return
+        returns = np.zeros_like(self.prices)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            returns[1:] = self.prices[1:] / self.prices[:-1] - 1
+        returns = np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+        weights = held / np.maximum(held.sum(axis=1, keepdims=True), 1)
+        weighted = np.zeros_like(returns)
+        weighted[1:] = weights[:-1] * returns[1:]
+
+        growth = np.cumprod(1 + weighted.sum(axis=1))
+        self.equity = self.initial_capital * growth
+        peaks = np.maximum.accumulate(self.equity)
+        self.drawdown = (peaks - self.equity) / peaks * 100
+
+        # Each symbol's P&L contribution, from the equity it was allocated
+        equity_before = self.initial_capital * np.concatenate(([1.0], growth[:-1]))
+        contribution = (weighted * equity_before[:, np.newaxis]).sum(axis=0)
+
+        # Per-trade returns, aggregated per symbol without a Python loop
+        trade_returns = self.prices[exit_bars, trade_symbols] / self.prices[entry_bars, trade_symbols] - 1
+        wins = trade_returns > 0
+        trades = np.bincount(trade_symbols, minlength=n_symbols)
+        winning = np.bincount(trade_symbols, weights=wins, minlength=n_symbols).astype(np.int64)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            avg_return = np.bincount(trade_symbols, weights=trade_returns, minlength=n_symbols) / trades
+
+        self.symbol_metrics = pd.DataFrame({
+            'total_trades': trades,
+            'winning_trades': winning,
+            'losing_trades': trades - winning,
+            'win_rate': np.where(trades > 0, winning / np.maximum(trades, 1) * 100, 0.0),
+            'avg_trade_return': np.nan_to_num(avg_return * 100),
+            'exposure': held.mean(axis=0) * 100,
+            'profit': contribution,
+        }, index=pd.Index(self.symbols, name='symbol'))
+
+        final_capital = float(self.equity[-1]) if len(self.equity) else float(self.initial_capital)
+        total_trades = int(trades.sum())
+        self.metrics = {
+            'total_trades': total_trades,
+            'winning_trades': int(wins.sum()),
+            'losing_trades': total_trades - int(wins.sum()),
+            'win_rate': wins.sum() / total_trades * 100 if total_trades > 0 else 0,
+            'total_profit': final_capital - self.initial_capital,
+            'max_drawdown': float(self.drawdown.max()) if len(self.drawdown) else 0,
+            'exposure': float(held.any(axis=1).mean() * 100) if len(held) else 0,
+            'final_capital': final_capital,
+        }
+
+        # Output results
+        print("\n=== Portfolio Backtest Results ===")
+        print(f"Symbols: {n_symbols}")
+        print(f"Total Trades: {self.metrics['total_trades']}")
+        print(f"Win Rate: {self.metrics['win_rate']:.2f}%")
+        print(f"Total Profit: {self.metrics['total_profit']:.2f}")
+        print(f"Max Drawdown: {self.metrics['max_drawdown']:.2f}%")
+        print(f"Exposure: {self.metrics['exposure']:.2f}%")
+        print(f"Final capital after backtest: {final_capital:.2f}")
+
+        return final_capital
@@ -0,0 +1,171 @@
+import pandas as pd
+import numpy as np
+
+from bar_store import CompactBars, epoch_to_index, index_to_epoch
+
+# Bar lengths in seconds
+INTERVAL_SECONDS = {
+    '1m': 60,
+    '5m': 5 * 60,
+    '15m': 15 * 60,
+    '1h': 60 * 60,
+    '1d': 24 * 60 * 60,
+}
+
+# NSE session in seconds after IST midnight; intraday buckets are anchored at the open
+IST_OFFSET = 5 * 60 * 60 + 30 * 60
+SESSION_OPEN = 9 * 60 * 60 + 15 * 60
+SESSION_CLOSE = 15 * 60 * 60 + 30 * 60
+
+# How each column combines into a coarser bar; absent columns are skipped
+AGGREGATIONS = {
+    'open': 'first',
+    'high': 'max',
+    'low': 'min',
+    'close': 'last',
+    'volume': 'sum',
+}
+
+
+# Bucketing
+def bucket_starts(timestamps, interval):
+    """Epoch seconds of the bucket each bar falls in.
+
+    Intraday buckets start at 09:15 IST (09:15, 10:15, ... for '1h'), daily
+    buckets at IST midnight, matching the bars Dhan returns per interval.
+    """
+    seconds = INTERVAL_SECONDS[interval]
+    local = np.asarray(timestamps, dtype=np.int64) + IST_OFFSET
+    day = local // 86400 * 86400
+    if seconds >= 86400:
+        return day - IST_OFFSET
+    return day + SESSION_OPEN + (local - day - SESSION_OPEN) // seconds * seconds - IST_OFFSET
+
+
+def bucket_ends(starts, interval):
+    """Epoch seconds at which each bucket is complete (capped at the session close)."""
+    starts = np.asarray(starts, dtype=np.int64)
+    day = (starts + IST_OFFSET) // 86400 * 86400 - IST_OFFSET
+    return np.minimum(starts + INTERVAL_SECONDS[interval], day + SESSION_CLOSE)
+
+
+def resample_arrays(columns, interval):
+    """Resamples a dict of bar columns with epoch `timestamp`s in ascending order.
+
+    Each output bar is labelled with its bucket start. One pass of
+    `ufunc.reduceat` per column, so millions of bars take milliseconds.
+    """
+    keys = bucket_starts(columns['timestamp'], interval)
+    starts = np.flatnonzero(np.diff(keys, prepend=keys[:1] - 1)) if len(keys) else np.empty(0, dtype=np.int64)
+    ends = np.append(starts[1:], len(keys)) - 1
+
+    bars = {}
+    for name, how in AGGREGATIONS.items():
+        if name not in columns:
+            continue
+        values = np.asarray(columns[name])
+        if not len(starts):
+            bars[name] = values[:0]
+        elif how == 'first':
+            bars[name] = values[starts]
+        elif how == 'last':
+            bars[name] = values[ends]
+        elif how == 'max':
+            bars[name] = np.maximum.reduceat(values, starts)
+        elif how == 'min':
+            bars[name] = np.minimum.reduceat(values, starts)
+        else:
+            bars[name] = np.add.reduceat(values, starts)
+    bars['timestamp'] = keys[starts]
+    return bars
+
+
+def _to_columns(data):
+    if isinstance(data, CompactBars):
+        return data.columns
+    columns = {name: data[name].to_numpy() for name in AGGREGATIONS if name in data}
+    columns['timestamp'] = index_to_epoch(data.index)
+    return columns
+
+
+def _from_columns(columns, like):
+    if isinstance(like, CompactBars):
+        return CompactBars(columns)
+    return pd.DataFrame({name: values for name, values in columns.items() if name != 'timestamp'},
+                        index=epoch_to_index(columns['timestamp']))
+
+
+def resample(data, interval):
+    """Resamples an OHLCV DataFrame (naive IST index) or CompactBars to `interval`."""
+    return _from_columns(resample_arrays(_to_columns(data), interval), data)
+
+
+# Incremental Resampling
+class BarResampler:
+    """Resamples live bars as they arrive.
+
+    `update` takes a dict of columns (one bar or a batch) and returns the
+    coarser bars completed by it. The bucket still forming is kept in
+    `pending` and finished once a bar from a later bucket arrives, or by
+    `flush` at the end of the session.
+    """
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.pending = None
+
+    def update(self, columns):
+        columns = {name: np.atleast_1d(values) for name, values in columns.items()}
+        if self.pending is not None:
+            # The pending bar is labelled with its bucket start, so it re-buckets onto itself
+            columns = {name: np.concatenate((self.pending[name], values)) for name, values in columns.items()}
+        bars = resample_arrays(columns, self.interval)
+        last = len(bars['timestamp']) - 1
+        if last < 0:
+            return bars
+        self.pending = {name: values[last:] for name, values in bars.items()}
+        return {name: values[:last] for name, values in bars.items()}
+
+    def flush(self):
+        """Returns the pending bar as complete and clears it."""
+        bars, self.pending = self.pending, None
+        return bars
+
+
+# Multi-Timeframe Features
+class MultiTimeframe:
+    """Higher timeframes derived locally from one fetch of base bars.
+
+    `frames[interval]` holds each resampled series. `align` maps values
+    computed on a higher timeframe back onto the base bars, where every base
+    bar only sees the last higher bar completed by its own close, so
+    features carry no lookahead.
+    """
+
+    def __init__(self, data, base_interval, intervals=('1h', '1d')):
+        self.data = data
+        self.base_interval = base_interval
+        self.columns = _to_columns(data)
+        timestamps = self.columns['timestamp']
+        self.base_closes = np.minimum(timestamps + INTERVAL_SECONDS[base_interval],
+                                      bucket_ends(bucket_starts(timestamps, '1d'), '1d'))
+        self.bars = {interval: resample_arrays(self.columns, interval) for interval in intervals}
+        self.frames = {interval: _from_columns(bars, data) for interval, bars in self.bars.items()}
+
+    def __getitem__(self, interval):
+        return self.frames[interval]
+
+    def align(self, interval, values):
+        """Values per `interval` bar, forward-filled onto the base bars (NaN before the first)."""
+        values = np.asarray(values, dtype=np.float64)
+        ends = bucket_ends(self.bars[interval]['timestamp'], interval)
+        latest = np.searchsorted(ends, self.base_closes, side='right') - 1
+        aligned = values[np.maximum(latest, 0)] if len(values) else np.full(len(latest), np.nan)
+        aligned[latest < 0] = np.nan
+        return aligned
+
+    def features(self, columns=('close',)):
+        """DataFrame on the base index with `<column>_<interval>` for every higher timeframe."""
+        return pd.DataFrame({f'{name}_{interval}': self.align(interval, bars[name])
+                             for interval, bars in self.bars.items() for name in columns},
+                            index=self.data.index)
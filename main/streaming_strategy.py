@@ -0,0 +1,150 @@
+import math
+
+from indicator_cache import TICK_SCALE
+
+
+def _ticks(value):
+    """`value * TICK_SCALE` as an int when it is a whole number of ticks, else None"""
+    ticks = value * TICK_SCALE
+    if not math.isfinite(ticks) or abs(ticks - round(ticks)) >= 1e-6:
+        return None
+    return round(ticks)
+
+
+# Incremental Rolling Mean
+class RollingMean:
+    """O(1)-per-bar rolling mean over a ring buffer (min_periods=1).
+
+    While every value in the window is a whole number of ticks, the mean is
+    the exactly rounded one from an integer tick sum, as IndicatorCache
+    computes it. Otherwise it uses the same compensated add/remove updates
+    as pandas' rolling mean, reproducing
+    `Series.rolling(window, min_periods=1).mean()`.
+    """
+
+    def __init__(self, window):
+        self.window = window
+        self.buffer = [math.nan] * window
+        self.count = 0  # Bars seen
+        self.nobs = 0  # Non-NaN values in the window
+        self.sum = 0.0
+        self.ticks = 0  # Sum of the window's whole-tick values, in ticks
+        self.off_tick = 0  # Values in the window that are not whole ticks
+        self.neg_count = 0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.same_value_count = 0
+        self.prev_value = math.nan
+        self.value = math.nan
+
+    def update(self, value):
+        value = float(value)
+        slot = self.count % self.window
+
+        # Drop the value leaving the window
+        if self.count >= self.window:
+            old = self.buffer[slot]
+            if not math.isnan(old):
+                self.nobs -= 1
+                ticks = _ticks(old)
+                if ticks is None:
+                    self.off_tick -= 1
+                else:
+                    self.ticks -= ticks
+                y = -old - self.compensation_remove
+                t = self.sum + y
+                self.compensation_remove = t - self.sum - y
+                self.sum = t
+                if math.copysign(1.0, old) < 0:
+                    self.neg_count -= 1
+
+        # Add the new value
+        if self.count == 0:
+            self.prev_value = value
+        if not math.isnan(value):
+            self.nobs += 1
+            ticks = _ticks(value)
+            if ticks is None:
+                self.off_tick += 1
+            else:
+                self.ticks += ticks
+            y = value - self.compensation_add
+            t = self.sum + y
+            self.compensation_add = t - self.sum - y
+            self.sum = t
+            if math.copysign(1.0, value) < 0:
+                self.neg_count += 1
+            if value == self.prev_value:
+                self.same_value_count += 1
+            else:
+                self.same_value_count = 1
+            self.prev_value = value
+
+        self.buffer[slot] = value
+        self.count += 1
+
+        if self.nobs == 0:
+            self.value = math.nan
+        elif self.off_tick == 0:
+            self.value = self.ticks / (self.nobs * TICK_SCALE)  # Exact integer division
+        elif self.same_value_count >= self.nobs:
+            self.value = self.prev_value
+        else:
+            self.value = self.sum / self.nobs
+            if self.neg_count == 0 and self.value < 0:
+                self.value = 0.0
+            elif self.neg_count == self.nobs and self.value > 0:
+                self.value = 0.0
+        return self.value
+
+
+# Streaming Moving Average Crossover Strategy
+class StreamingCrossoverStrategy:
+    """Incremental MovingAverageCrossoverStrategy for live bars.
+
+    Each `update` costs O(1) and returns the bar's signal: 1.0 on a bullish
+    crossover, -1.0 on a bearish one, 0.0 otherwise (NaN on the first bar).
+    Replaying a history gives the same values as the batch `generate_signals`.
+    """
+
+    def __init__(self, short_window=10, long_window=50):
+        self.short_window = short_window
+        self.long_window = long_window
+        self.short_ma = RollingMean(short_window)
+        self.long_ma = RollingMean(long_window)
+        self.bars = 0
+        self.position = 0.0
+
+    def update(self, close):
+        short_ma = self.short_ma.update(close)
+        long_ma = self.long_ma.update(close)
+
+        # Signals are held flat until short_window bars have passed
+        position = 1.0 if self.bars >= self.short_window and short_ma > long_ma else 0.0
+        signal = math.nan if self.bars == 0 else position - self.position
+        self.position = position
+        self.bars += 1
+        return signal
+
+    def _event(self, timestamp, close, signal):
+        return {
+            'timestamp': timestamp,
+            'signal': signal,
+            'price': float(close),
+            'short_ma': self.short_ma.value,
+            'long_ma': self.long_ma.value,
+        }
+
+    def run(self, bars):
+        """Yields a crossover event for each (timestamp, close) bar where one happens."""
+        for timestamp, close in bars:
+            signal = self.update(close)
+            if signal == 1.0 or signal == -1.0:
+                yield self._event(timestamp, close, signal)
+
+    async def arun(self, bars):
+        """Async version of `run` for an async iterator of (timestamp, close) bars."""
+        async for timestamp, close in bars:
+            signal = self.update(close)
+            if signal == 1.0 or signal == -1.0:
+                yield self._event(timestamp, close, signal)
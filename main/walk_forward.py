@@ -0,0 +1,112 @@
+import itertools
+import os
+from datetime import datetime, timedelta
+from multiprocessing import Pool
+
+import pandas as pd
+import numpy as np
+
+from optimizer import METRIC_COLUMNS, backtest_windows, init_worker, shared_prices
+
+
+def walk_forward_folds(n_bars, train_bars, test_bars, step_bars=None, anchored=False):
+    """Rolling (train_start, train_end, test_start, test_end) bar ranges, ends exclusive.
+
+    Each test range directly follows its train range; folds advance by
+    `step_bars` (default `test_bars`). Anchored folds always train from bar 0.
+    """
+    step_bars = step_bars or test_bars
+    folds = []
+    train_start = 0
+    while train_start + train_bars + test_bars <= n_bars:
+        train_end = train_start + train_bars
+        folds.append((0 if anchored else train_start, train_end, train_end, train_end + test_bars))
+        train_start += step_bars
+    return folds
+
+
+def _run_fold(task):
+    """Optimizes the windows on a fold's train range and evaluates the best pair on its test range."""
+    fold, (train_start, train_end, test_start, test_end), params, rank_by, ascending = task
+
+    best, best_metrics = None, None
+    for short_window, long_window in params:
+        metrics = backtest_windows(short_window, long_window, train_start, train_end)
+        score = metrics[rank_by]
+        if best is None or (score < best_metrics[rank_by] if ascending else score > best_metrics[rank_by]):
+            best, best_metrics = (short_window, long_window), metrics
+
+    test_metrics = backtest_windows(*best, test_start, test_end)
+    return {
+        'fold': fold,
+        'train_start': train_start,
+        'train_end': train_end,
+        'test_start': test_start,
+        'test_end': test_end,
+        'short_window': best[0],
+        'long_window': best[1],
+        **{f'train_{name}': best_metrics[name] for name in METRIC_COLUMNS},
+        **{f'test_{name}': test_metrics[name] for name in METRIC_COLUMNS},
+    }
+
+
+# Walk-Forward Analysis
+def walk_forward(data, short_windows, long_windows, train_bars, test_bars, step_bars=None, anchored=False,
+                 rank_by='total_profit', ascending=False, initial_capital=100000, share_quantity=10,
+                 processes=None):
+    """Walk-forward optimization of MovingAverageCrossoverStrategy windows.
+
+    Every fold grid-searches the windows on its train range and backtests the
+    best pair out of sample on the following test range. Folds run in
+    parallel; each worker keeps one SMA cache over the shared prices, so
+    overlapping folds reuse the same indicator arrays. Returns one row per
+    fold with the chosen windows and their train_/test_ metrics.
+    """
+    close = np.asarray(data['close'], dtype=np.float64).ravel()
+    params = [(int(s), int(l)) for s, l in itertools.product(short_windows, long_windows) if s < l]
+    if not params:
+        raise ValueError(f"No (short, long) window pair with short < long in {list(short_windows)} x {list(long_windows)}")
+    folds = walk_forward_folds(len(close), train_bars, test_bars, step_bars, anchored)
+    processes = min(processes or os.cpu_count(), max(len(folds), 1))
+
+    tasks = [(fold, bounds, params, rank_by, ascending) for fold, bounds in enumerate(folds)]
+    with shared_prices(close) as shm_name:
+        with Pool(processes, initializer=init_worker,
+                  initargs=(shm_name, len(close), initial_capital, share_quantity)) as pool:
+            rows = pool.map(_run_fold, tasks, chunksize=1)
+            pool.close()  # Let workers exit and detach before the block is unlinked
+            pool.join()
+
+    results = pd.DataFrame(rows)
+    if len(results):
+        for column in ('train_start', 'test_start'):
+            results[column.replace('start', 'from')] = data.index[results[column]]
+        for column in ('train_end', 'test_end'):
+            results[column.replace('end', 'to')] = data.index[results[column] - 1]
+    return results
+
+
+# Main function for console execution
+def main():
+    from without_pyqt5 import fetch_data
+    from bar_store import BarStore
+
+    security_id = '500325'
+    start_date = (datetime.now() - timedelta(days=5 * 365)).strftime('%Y-%m-%d')
+    end_date = datetime.now().strftime('%Y-%m-%d')
+
+    data = fetch_data(security_id, start_date, end_date, store=BarStore())
+
+    if data.empty:
+        print("No data available for the selected parameters.")
+        return
+
+    # One year of daily bars to train, one quarter to test
+    results = walk_forward(data, range(2, 21), range(10, 101, 5), train_bars=250, test_bars=60)
+    print(results[['fold', 'train_from', 'test_from', 'test_to', 'short_window', 'long_window',
+                   'train_total_profit', 'test_total_profit']].to_string(index=False))
+    print(f"\nOut-of-sample profit: {results['test_total_profit'].sum():.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@ import yfinance as yf
 import pandas as pd
 import numpy as np
 
+from backtest_engine import TRADE_DTYPE, print_results, print_trade_log, run_backtest
+
 
 # Step 1: Fetch Historical Data from Yahoo Finance
 def fetch_data(symbol, start_date, end_date, interval="15m"):
@@ -13,22 +15,27 @@ def fetch_data(symbol, start_date, end_date, interval="15m"):
 
 # Step 2: Define the Moving Average Crossover Strategy
 class MovingAverageCrossoverStrategy:
-    def __init__(self, data, short_window=10, long_window=50, initial_capital=100000, share_quantity=10):
+    def __init__(self, data, short_window=10, long_window=50, initial_capital=100000, share_quantity=10,
+                 verbose=0):
         self.data = data
         self.short_window = short_window
         self.long_window = long_window
         self.initial_capital = initial_capital
         self.share_quantity = share_quantity
+        self.verbose = verbose  # 0: silent, 1: summary, 2: summary and every trade
         self.signals = pd.DataFrame(index=self.data.index)
         self.signals['signal'] = 0.0
 
-        # Metrics tracking
+        # Metrics tracking, filled in by backtest()
         self.total_trades = 0
         self.winning_trades = 0
         self.losing_trades = 0
         self.total_profit = 0.0
-        self.profits = []
-        self.drawdowns = []
+        self.metrics = {}
+        self.ledger = np.empty(0, dtype=TRADE_DTYPE)
+        self.equity = np.empty(0)
+        self.profits = self.ledger['pnl']
+        self.drawdowns = np.empty(0)
 
     def generate_signals(self):
         """Generates buy/sell signals based on MA crossover strategy."""
@@ -49,57 +56,27 @@ class MovingAverageCrossoverStrategy:
 
     def backtest(self):
         """Backtests the strategy and calculates final portfolio value and metrics."""
-        capital = self.initial_capital
-        peak = capital  # Track the peak for drawdown calculation
-        positions = []
-
-        for i in range(1, len(self.data)):
-            if self.signals['signal'].iloc[i] == 1.0:  # Buy signal
-                buy_price = self.data['close'].iloc[i].item()  # Ensure buy_price is a scalar
-                positions.append(buy_price)
-                print(f"Buying at {buy_price} on {self.data.index[i]}")
-            elif self.signals['signal'].iloc[i] == -1.0 and positions:  # Sell signal
-                sell_price = self.data['close'].iloc[i].item()  # Ensure sell_price is a scalar
-                buy_price = positions.pop(0)
-                profit = (sell_price - buy_price) * self.share_quantity
-                capital += profit
-                self.total_trades += 1
-                self.total_profit += profit
-                self.profits.append(profit)
-                print(f"Selling at {sell_price} on {self.data.index[i]}, Profit: {profit}")
-
-                # Track win/loss metrics
-                if profit > 0:
-                    self.winning_trades += 1
-                else:
-                    self.losing_trades += 1
-
-                # Track drawdown
-                if capital > peak:
-                    peak = capital
-                drawdown = (peak - capital) / peak * 100
-                self.drawdowns.append(drawdown)
-
-        # Final metrics calculation
-        win_rate = (self.winning_trades / self.total_trades) * 100 if self.total_trades > 0 else 0
-        max_drawdown = max(self.drawdowns) if self.drawdowns else 0
-        avg_profit = np.mean([p for p in self.profits if p > 0]) if self.winning_trades > 0 else 0
-        avg_loss = np.mean([p for p in self.profits if p < 0]) if self.losing_trades > 0 else 0
+        result = run_backtest(self.data['close'], self.signals['signal'],
+                              self.initial_capital, self.share_quantity, index=self.data.index)
+
+        # Metrics tracking
+        self.ledger = result['ledger']
+        self.equity = result['equity']
+        self.metrics = result['metrics']
+        self.total_trades = self.metrics['total_trades']
+        self.winning_trades = self.metrics['winning_trades']
+        self.losing_trades = self.metrics['losing_trades']
+        self.total_profit = self.metrics['total_profit']
+        self.profits = self.ledger['pnl']
+        self.drawdowns = result['trade_drawdowns']
 
         # Output results
-        print("\n=== Backtest Results ===")
-        print(f"Total Trades: {self.total_trades}")
-        print(f"Winning Trades: {self.winning_trades}")
-        print(f"Losing Trades: {self.losing_trades}")
-        print(f"Win Rate: {win_rate:.2f}%")
-        print(f"Total Profit: {self.total_profit:.2f}")
-        print(f"Max Drawdown: {max_drawdown:.2f}%")
-        print(f"Average Profit per Trade: {avg_profit:.2f}")
-        print(f"Average Loss per Trade: {avg_loss:.2f}")
-        print(f"Final capital after backtest: {capital:.2f}")
-        print(f"Final Profit/Loss: {capital - self.initial_capital:.2f}")
-
-        return capital
+        if self.verbose >= 2:
+            print_trade_log(self.data['close'], result['buys'], self.ledger, self.data.index)
+        if self.verbose >= 1:
+            print_results(self.metrics, self.initial_capital)
+
+        return self.metrics['final_capital']
 
 # Step 3: Run the Strategy with Yahoo Finance Data
 def main():
@@ -113,7 +90,7 @@ def main():
     print(data.head())
 
     # Initialize and run the strategy
-    strategy = MovingAverageCrossoverStrategy(data, short_window=10, long_window=50)
+    strategy = MovingAverageCrossoverStrategy(data, short_window=10, long_window=50, verbose=2)
     signals = strategy.generate_signals()
     final_capital = strategy.backtest()
     print(f"Profit/Loss: {final_capital - strategy.initial_capital}")